@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+
+_httpx: ModuleType | None = None
+
+
+def get_httpx() -> ModuleType:
+    # httpx pulls in ssl, certifi and h11; only commands that hit the network should pay for it.
+    global _httpx
+    if _httpx is None:
+        import httpx as _httpx
+    return _httpx
+
+
+def new_client(timeout: float) -> httpx.Client:
+    return get_httpx().Client(timeout=timeout, follow_redirects=True)
+
+
+@contextmanager
+def borrow_client(client: httpx.Client | None, timeout: float) -> Iterator[httpx.Client]:
+    # Reuse the caller's client (and its open connections) when given one; otherwise open a
+    # short-lived client that is closed on exit.
+    if client is not None:
+        yield client
+        return
+    with new_client(timeout) as owned:
+        yield owned
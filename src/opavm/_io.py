@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import itertools
+import os
+from pathlib import Path
+
+_TEMP_FLAGS = (
+    os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+)
+_temp_counter = itertools.count()
+
+
+def create_temp(directory: Path, prefix: str, mode: int = 0o600) -> tuple[int, str]:
+    """Create ``<prefix>.<pid>.<n>.tmp`` in ``directory`` and return its fd and path."""
+    while True:
+        name = os.path.join(str(directory), f"{prefix}.{os.getpid()}.{next(_temp_counter)}.tmp")
+        try:
+            return os.open(name, _TEMP_FLAGS, mode), name
+        except FileExistsError:
+            # Left over from a crashed process that had the same pid; try the next name.
+            continue
+
+
+def write_all(fd: int, payload: bytes) -> None:
+    """Write all of ``payload`` to ``fd``, retrying after short writes."""
+    view = memoryview(payload)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def fsync_dir(directory: Path) -> None:
+    # Directories cannot be opened for fsync on Windows; NTFS journals the rename itself.
+    if os.name == "nt":
+        return
+    fd = os.open(str(directory), os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def durable_replace(tmp: str | Path, final: Path) -> None:
+    """Atomically move ``tmp`` over ``final`` and persist the directory entry."""
+    os.replace(tmp, final)
+    fsync_dir(final.parent)
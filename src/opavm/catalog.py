@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import NamedTuple
 
 from opavm.errors import OpavmError
 
 
-@dataclass(frozen=True)
-class ToolSpec:
+class ToolSpec(NamedTuple):
     name: str
     display_name: str
     binary_base: str
@@ -14,7 +15,7 @@ class ToolSpec:
     pin_filename: str
 
 
-SUPPORTED_TOOLS: dict[str, ToolSpec] = {
+SUPPORTED_TOOLS: Mapping[str, ToolSpec] = MappingProxyType({
     "opa": ToolSpec(
         name="opa",
         display_name="OPA",
@@ -29,13 +30,15 @@ SUPPORTED_TOOLS: dict[str, ToolSpec] = {
         default_repo="StyraInc/regal",
         pin_filename=".regal-version",
     ),
-}
+})
+_SUPPORTED_OPTIONS = ", ".join(sorted(SUPPORTED_TOOLS))
 
 
 def get_tool(tool: str) -> ToolSpec:
-    normalized = tool.lower().strip()
-    spec = SUPPORTED_TOOLS.get(normalized)
+    # Callers usually pass canonical names, so try them before normalizing.
+    spec = SUPPORTED_TOOLS.get(tool)
     if spec is None:
-        options = ", ".join(sorted(SUPPORTED_TOOLS))
-        raise OpavmError("Unknown tool.", f"Supported tools: {options}")
+        spec = SUPPORTED_TOOLS.get(tool.strip().lower())
+    if spec is None:
+        raise OpavmError("Unknown tool.", f"Supported tools: {_SUPPORTED_OPTIONS}")
     return spec
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
-import subprocess
+import importlib
+import os
+import sys
+import time
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import typer
-from rich import box
-from rich.console import Console
-from rich.filesize import decimal
-from rich.progress import BarColumn, Progress, SpinnerColumn, TaskProgressColumn, TextColumn
-from rich.table import Table
 
-from opavm import catalog, config, github, installer, resolver, runner, shim
+from opavm import catalog
 from opavm.errors import OpavmError, VersionNotInstalledError
 
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.table import Table
+
+# Submodules that pull in httpx/rich are imported inside the commands that need them so
+# fast paths like `opavm which` and `opavm --help` stay cheap. They remain reachable as
+# `opavm.cli.<name>` through the module-level __getattr__ below.
+_LAZY_SUBMODULES = frozenset({"config", "github", "installer", "resolver", "runner", "shim"})
+
 app = typer.Typer(
     no_args_is_help=True,
     help=(
@@ -29,8 +38,7 @@ app = typer.Typer(
     ),
     rich_markup_mode="rich",
 )
-console = Console()
-OPA_COMMANDS = [
+OPA_COMMANDS: tuple[tuple[str, str], ...] = (
     ("bench", "Benchmark a Rego query"),
     ("build", "Build an OPA bundle"),
     ("capabilities", "Print the capabilities of OPA"),
@@ -47,11 +55,37 @@ OPA_COMMANDS = [
     ("sign", "Generate an OPA bundle signature"),
     ("test", "Execute Rego test cases"),
     ("version", "Print the version of OPA"),
-]
+)
+_EXEC_HELP_ARGS = frozenset({"-h", "--help", "help"})
+_PROGRESS_REFRESH_INTERVAL = 1 / 30
+_PROGRESS_MIN_STEP = 0.5
+_cwd: Path | None = None
+
+
+@lru_cache(maxsize=1)
+def _get_console() -> Console:
+    from rich.console import Console
+
+    return Console()
+
+
+def __getattr__(name: str) -> Any:
+    if name == "console":
+        return _get_console()
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f"opavm.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _get_cwd() -> Path:
+    global _cwd
+    if _cwd is None:
+        _cwd = Path.cwd()
+    return _cwd
 
 
 def _handle_error(err: OpavmError) -> None:
-    console.print(f"[red]{err.format()}[/red]")
+    _get_console().print(f"[red]{err.format()}[/red]")
     raise typer.Exit(code=1)
 
 
@@ -85,13 +119,18 @@ def _resolve_install_target_with_option(
 
 
 def _install_with_progress(tool: str, version: str) -> str:
+    from rich.filesize import decimal
+    from rich.progress import BarColumn, Progress, SpinnerColumn, TaskProgressColumn, TextColumn
+
+    from opavm import installer
+
     spec = catalog.get_tool(tool)
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
         TaskProgressColumn(),
-        console=console,
+        console=_get_console(),
         transient=True,
     ) as progress:
         task_id = progress.add_task("Preparing install...", total=100.0, completed=0.0)
@@ -107,21 +146,34 @@ def _install_with_progress(tool: str, version: str) -> str:
                 )
             elif stage == "verifying":
                 progress.update(task_id, description=f"Verifying {spec.display_name} binary...", completed=95.0)
-            elif stage == "verifying_checksum":
-                progress.update(task_id, description=f"Verifying {spec.display_name} checksum...", completed=92.0)
             elif stage == "done":
                 progress.update(task_id, description="Install complete.", completed=100.0)
             elif stage == "already_installed":
                 progress.update(task_id, description="Version already installed.", completed=100.0)
 
+        last_update_ts = 0.0
+        last_pct = 0.0
+
         def on_download(total_bytes: int | None, downloaded_bytes: int) -> None:
+            nonlocal last_update_ts, last_pct
+            now = time.monotonic()
+            due = now - last_update_ts >= _PROGRESS_REFRESH_INTERVAL
             if total_bytes and total_bytes > 0:
                 ratio = min(downloaded_bytes / total_bytes, 1.0)
                 progress_pct = 10.0 + (ratio * 80.0)
+                # Downloads report every chunk; only redraw when the bar visibly moves or the
+                # refresh interval elapsed, but always land the final update.
+                if ratio < 1.0 and not due and progress_pct - last_pct < _PROGRESS_MIN_STEP:
+                    return
+                last_update_ts = now
+                last_pct = progress_pct
                 progress.update(
                     task_id, description=f"Downloading {spec.display_name} binary...", completed=progress_pct
                 )
                 return
+            if not due:
+                return
+            last_update_ts = now
             # Unknown content length: keep moving the bar while showing bytes received.
             task = progress.tasks[task_id]
             next_progress = task.completed + 1.0
@@ -136,33 +188,50 @@ def _install_with_progress(tool: str, version: str) -> str:
         return installer.install(version, tool=spec.name, on_status=on_status, on_download=on_download)
 
 
+@lru_cache(maxsize=1)
+def _opa_commands_table() -> Table:
+    from rich import box
+    from rich.table import Table
+    from rich.text import Text
+
+    table = Table(title="Available OPA Commands", box=box.SIMPLE_HEAVY, show_header=True)
+    table.add_column("Command", style="cyan")
+    table.add_column("Description")
+    # Plain Text cells skip markup parsing; the column style still colors the command.
+    for command, description in OPA_COMMANDS:
+        table.add_row(Text(command), Text(description))
+    return table
+
+
 def _render_exec_help(spec: catalog.ToolSpec) -> None:
-    console.print()
     if spec.name == "opa":
-        console.print("Usage: opavm exec -- <opa-args>")
+        usage = "Usage: opavm exec -- <opa-args>"
+        examples = [
+            "opavm exec -- version",
+            "opavm exec -- test -v ./policy",
+            'opavm exec -- eval -i input.json -d policy.rego "data.example.allow"',
+        ]
     else:
-        console.print(f"Usage: opavm exec --tool {spec.name} -- <{spec.name}-args>")
-    console.print(
-        f"Resolves {spec.display_name} version ({spec.pin_filename} > global default) and forwards args."
-    )
-    console.print()
-    console.print("Examples")
-    if spec.name == "opa":
-        console.print("opavm exec -- version")
-        console.print("opavm exec -- test -v ./policy")
-        console.print('opavm exec -- eval -i input.json -d policy.rego "data.example.allow"')
-    else:
-        console.print("opavm exec --tool regal -- version")
-        console.print("opavm exec --tool regal -- lint policy/")
-    console.print()
+        usage = f"Usage: opavm exec --tool {spec.name} -- <{spec.name}-args>"
+        examples = [
+            "opavm exec --tool regal -- version",
+            "opavm exec --tool regal -- lint policy/",
+        ]
+    lines = [
+        "",
+        usage,
+        f"Resolves {spec.display_name} version ({spec.pin_filename} > global default) and forwards args.",
+        "",
+        "Examples",
+        *examples,
+        "",
+    ]
+    # One print call means one markup pass and one write for the whole static block.
+    console = _get_console()
+    console.print("\n".join(lines))
 
     if spec.name == "opa":
-        table = Table(title="Available OPA Commands", box=box.SIMPLE_HEAVY, show_header=True)
-        table.add_column("Command", style="cyan")
-        table.add_column("Description")
-        for command, description in OPA_COMMANDS:
-            table.add_row(command, description)
-        console.print(table)
+        console.print(_opa_commands_table())
 
 
 @app.command()
@@ -185,6 +254,8 @@ def install(
     [green]opavm install regal 0.38.1[/green]
     [green]opavm install 0.38.1 --tool regal[/green]
     """
+    from opavm import installer, shim
+
     try:
         spec, target_version = _resolve_install_target_with_option(subject, version, tool)
         resolved = _install_with_progress(spec.name, target_version)
@@ -192,6 +263,7 @@ def install(
             shim_path = shim.ensure_shim()
     except OpavmError as err:
         _handle_error(err)
+    console = _get_console()
     console.print(f"Installed {spec.display_name} {resolved}.")
     if spec.name == "opa":
         console.print(f"Shim ready at {shim_path}.")
@@ -210,19 +282,21 @@ def list_versions(
     ),
 ) -> None:
     """List installed tool versions."""
+    from opavm import installer
+
     try:
         spec = catalog.get_tool(tool)
     except OpavmError as err:
         _handle_error(err)
     versions = installer.installed_versions(tool=spec.name)
     if not versions:
+        console = _get_console()
         if spec.name == "opa":
             console.print("No installed versions. Run: opavm install latest")
         else:
             console.print(f"No installed {spec.display_name} versions. Run: opavm install {spec.name} latest")
         return
-    for version in versions:
-        console.print(version)
+    sys.stdout.write("\n".join(versions) + "\n")
 
 
 @app.command()
@@ -237,6 +311,8 @@ def use(
     ),
 ) -> None:
     """Set global default tool version."""
+    from opavm import config, installer
+
     try:
         spec = catalog.get_tool(tool)
         if not installer.is_installed(version, tool=spec.name):
@@ -252,7 +328,7 @@ def use(
         config.set_global_default(spec.name, version)
     except OpavmError as err:
         _handle_error(err)
-    console.print(f"Global default for {spec.display_name} set to {version}.")
+    _get_console().print(f"Global default for {spec.display_name} set to {version}.")
 
 
 @app.command()
@@ -267,6 +343,8 @@ def pin(
     ),
 ) -> None:
     """Pin tool version for current project."""
+    from opavm import installer
+
     try:
         spec = catalog.get_tool(tool)
         pinned_version = version
@@ -286,11 +364,11 @@ def pin(
                     install_hint,
                 )
             pinned_version = _install_with_progress(spec.name, version)
-        pin_file = Path.cwd() / spec.pin_filename
+        pin_file = _get_cwd() / spec.pin_filename
         pin_file.write_text(f"{pinned_version}\n", encoding="utf-8")
     except OpavmError as err:
         _handle_error(err)
-    console.print(f"Pinned {spec.display_name} {pinned_version} in {pin_file}.")
+    _get_console().print(f"Pinned {spec.display_name} {pinned_version} in {pin_file}.")
 
 
 @app.command()
@@ -304,12 +382,14 @@ def current(
     ),
 ) -> None:
     """Show active tool version and resolution reason."""
+    from opavm import resolver
+
     try:
         spec = catalog.get_tool(tool)
-        version, reason = resolver.resolve_version(Path.cwd(), tool=spec.name)
+        version, reason = resolver.resolve_version(_get_cwd(), tool=spec.name)
     except OpavmError as err:
         _handle_error(err)
-    console.print(f"{spec.display_name} {version} ({reason})")
+    _get_console().print(f"{spec.display_name} {version} ({reason})")
 
 
 @app.command()
@@ -323,12 +403,15 @@ def which(
     ),
 ) -> None:
     """Print resolved tool binary path."""
+    from opavm import runner
+
     try:
         spec = catalog.get_tool(tool)
-        _, _, binary = runner.resolved_binary_path(Path.cwd(), tool=spec.name)
+        _, _, binary = runner.resolved_binary_path(_get_cwd(), tool=spec.name)
     except OpavmError as err:
         _handle_error(err)
-    typer.echo(str(binary.resolve()))
+    # The shim captures this output, so skip Click/Rich formatting for the bare path.
+    sys.stdout.write(str(binary.resolve()) + "\n")
 
 
 @app.command(
@@ -349,26 +432,35 @@ def exec(
     ),
 ) -> None:
     """Run tool through resolved version and forward args."""
-    try:
-        spec = catalog.get_tool(tool)
-    except OpavmError as err:
-        _handle_error(err)
-
-    if len(ctx.args) == 1 and ctx.args[0] in {"-h", "--help", "help"}:
+    if len(ctx.args) == 1 and ctx.args[0] in _EXEC_HELP_ARGS:
+        try:
+            spec = catalog.get_tool(tool)
+        except OpavmError as err:
+            _handle_error(err)
         _render_exec_help(spec)
         raise typer.Exit(code=0)
 
+    from opavm import runner
+
     try:
-        _, _, binary = runner.resolved_binary_path(Path.cwd(), tool=spec.name)
+        spec = catalog.get_tool(tool)
+        _, _, binary = runner.resolved_binary_path(_get_cwd(), tool=spec.name)
     except OpavmError as err:
         _handle_error(err)
 
     cmd = [str(binary), *ctx.args]
+    sys.stdout.flush()
+    sys.stderr.flush()
     try:
-        proc = subprocess.run(cmd)
+        if os.name == "nt":
+            # Windows has no real exec; stay resident and propagate the child's exit code.
+            import subprocess
+
+            proc = subprocess.run(cmd, check=False)
+            raise typer.Exit(proc.returncode)
+        os.execv(cmd[0], cmd)
     except OSError as exc:
         _handle_error(OpavmError(f"Failed to execute {spec.display_name}.", str(exc)))
-    raise typer.Exit(proc.returncode)
 
 
 @app.command()
@@ -383,12 +475,14 @@ def uninstall(
     ),
 ) -> None:
     """Uninstall a specific tool version."""
+    from opavm import installer
+
     try:
         spec = catalog.get_tool(tool)
         installer.uninstall(version, tool=spec.name)
     except OpavmError as err:
         _handle_error(err)
-    console.print(f"Uninstalled {spec.display_name} {version}.")
+    _get_console().print(f"Uninstalled {spec.display_name} {version}.")
 
 
 @app.command("releases")
@@ -403,6 +497,11 @@ def releases(
     ),
 ) -> None:
     """Show recent tool releases from GitHub."""
+    from rich import box
+    from rich.table import Table
+
+    from opavm import github
+
     try:
         spec = catalog.get_tool(tool)
         repo = spec.default_repo
@@ -410,6 +509,7 @@ def releases(
     except OpavmError as err:
         _handle_error(err)
 
+    console = _get_console()
     console.print()
     console.print(f"{spec.display_name} Releases")
     console.print(f"https://github.com/{repo}/releases")
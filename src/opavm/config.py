@@ -1,36 +1,70 @@
 from __future__ import annotations
 
+import contextlib
 import json
 import os
-import tempfile
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
+from opavm import _io, _json
 from opavm.errors import OpavmError
 
 DEFAULT_BASE_DIR = Path.home() / ".opavm"
 
+# Parsed state keyed by (path, st_mtime_ns, st_size) so repeated reads skip json parsing.
+_STATE_CACHE: tuple[tuple[str, int, int], dict[str, Any]] | None = None
+
+
+class _Layout(NamedTuple):
+    base: Path
+    versions: Path
+    shims: Path
+    state: Path
+
+
+@cache
+def _layout(home: str | None) -> _Layout:
+    base = Path(home if home is not None else DEFAULT_BASE_DIR).expanduser()
+    return _Layout(base, base / "versions", base / "shims", base / "state.json")
+
+
+def _current_layout() -> _Layout:
+    # Keyed on the raw OPAVM_HOME value so overriding it (as tests do) needs no cache reset.
+    return _layout(os.environ.get("OPAVM_HOME"))
+
+
+def reset_path_cache() -> None:
+    _layout.cache_clear()
+    _tool_versions_dir.cache_clear()
+
 
 def base_dir() -> Path:
-    return Path(os.environ.get("OPAVM_HOME", DEFAULT_BASE_DIR)).expanduser()
+    return _current_layout().base
 
 
 def versions_dir() -> Path:
-    return base_dir() / "versions"
+    return _current_layout().versions
 
 
-def tool_versions_dir(tool: str) -> Path:
+@lru_cache(maxsize=8)
+def _tool_versions_dir(home: str | None, tool: str) -> Path:
+    layout = _layout(home)
     if tool == "opa":
-        return versions_dir()
-    return base_dir() / "tools" / tool / "versions"
+        return layout.versions
+    return layout.base / "tools" / tool / "versions"
+
+
+def tool_versions_dir(tool: str) -> Path:
+    return _tool_versions_dir(os.environ.get("OPAVM_HOME"), tool)
 
 
 def shims_dir() -> Path:
-    return base_dir() / "shims"
+    return _current_layout().shims
 
 
 def state_path() -> Path:
-    return base_dir() / "state.json"
+    return _current_layout().state
 
 
 def ensure_layout() -> None:
@@ -42,18 +76,10 @@ def _default_state() -> dict[str, Any]:
     return {"global_default": None, "global_defaults": {}}
 
 
-def load_state() -> dict[str, Any]:
-    path = state_path()
-    if not path.exists():
-        return _default_state()
-    try:
-        raw = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
-        raise OpavmError("Corrupt state file.", "Delete ~/.opavm/state.json and retry.") from exc
-    if not isinstance(raw, dict):
-        return _default_state()
-
+def _normalize_state(raw: Any) -> dict[str, Any]:
     state = _default_state()
+    if not isinstance(raw, dict):
+        return state
     state["global_default"] = raw.get("global_default")
 
     global_defaults = raw.get("global_defaults")
@@ -63,49 +89,105 @@ def load_state() -> dict[str, Any]:
             for tool, version in global_defaults.items()
             if isinstance(tool, str) and isinstance(version, str)
         }
-    else:
-        state["global_defaults"] = {}
+
+    # Pre-multi-tool state only had the top-level key; fold it in so lookups are one get.
+    legacy = state["global_default"]
+    if isinstance(legacy, str) and legacy.strip():
+        current = state["global_defaults"].get("opa")
+        if current is None or not current.strip():
+            state["global_defaults"]["opa"] = legacy
     return state
 
 
+def _copy_state(state: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "global_default": state["global_default"],
+        "global_defaults": dict(state["global_defaults"]),
+    }
+
+
+def _state_cache_key(path: Path) -> tuple[str, int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return str(path), st.st_mtime_ns, st.st_size
+
+
+def load_state() -> dict[str, Any]:
+    global _STATE_CACHE
+    path = state_path()
+    key = _state_cache_key(path)
+    if key is None:
+        return _default_state()
+    if _STATE_CACHE is not None and _STATE_CACHE[0] == key:
+        return _copy_state(_STATE_CACHE[1])
+    try:
+        raw = _json.loads(path.read_bytes())
+    except json.JSONDecodeError as exc:
+        raise OpavmError("Corrupt state file.", "Delete ~/.opavm/state.json and retry.") from exc
+
+    state = _normalize_state(raw)
+    _STATE_CACHE = (key, state)
+    return _copy_state(state)
+
+
+def _durable_state() -> bool:
+    return bool(os.environ.get("OPAVM_DURABLE_STATE", "").strip())
+
+
 def save_state(data: dict[str, Any]) -> None:
+    global _STATE_CACHE
     ensure_layout()
     path = state_path()
-    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix="state.", suffix=".tmp")
+    state = _normalize_state(data)
+    # One stat both validates the cached state and lets a save that changes nothing skip
+    # the write, since readers only ever see the normalized form.
+    current_key = _state_cache_key(path)
+    if current_key is not None and _STATE_CACHE == (current_key, state):
+        return
+    # The rename alone keeps readers from seeing a partial file; fsyncing the data and
+    # directory only adds crash durability, which most users don't need to pay for.
+    durable = _durable_state()
+    fd, tmp_name = _io.create_temp(path.parent, "state")
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(data, f)
-            f.write("\n")
-            f.flush()
-            os.fsync(f.fileno())
-        os.replace(tmp_name, path)
-    finally:
-        if os.path.exists(tmp_name):
+        try:
+            _io.write_all(fd, _json.dumps(data))
+            if durable:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        if durable:
+            _io.durable_replace(tmp_name, path)
+        else:
+            os.replace(tmp_name, path)
+    except BaseException:
+        # Only a failed save can leave the temp file behind; a successful one renamed it.
+        with contextlib.suppress(FileNotFoundError):
             os.remove(tmp_name)
+        raise
 
+    key = _state_cache_key(path)
+    _STATE_CACHE = (key, state) if key is not None else None
 
-def get_global_default(tool: str = "opa") -> str | None:
-    state = load_state()
-    global_defaults = state.get("global_defaults")
-    if isinstance(global_defaults, dict):
-        value = global_defaults.get(tool)
-        if isinstance(value, str) and value.strip():
-            return value
 
-    if tool == "opa":
-        legacy = state.get("global_default")
-        if isinstance(legacy, str) and legacy.strip():
-            return legacy
-    return None
+def get_global_default(tool: str = "opa") -> str | None:
+    value = load_state()["global_defaults"].get(tool)
+    return value if value is not None and value.strip() else None
 
 
 def set_global_default(tool: str, version: str) -> None:
+    set_global_defaults({tool: version})
+
+
+def set_global_defaults(versions: dict[str, str]) -> None:
+    """Set several tools' global defaults with a single state write."""
     state = load_state()
     global_defaults = state.get("global_defaults")
     if not isinstance(global_defaults, dict):
         global_defaults = {}
-    global_defaults[tool] = version
+    global_defaults.update(versions)
     state["global_defaults"] = global_defaults
-    if tool == "opa":
-        state["global_default"] = version
+    if "opa" in versions:
+        state["global_default"] = versions["opa"]
     save_state(state)
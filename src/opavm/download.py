@@ -1,15 +1,182 @@
 from __future__ import annotations
 
 import os
+import posixpath
+import re
 import shutil
-import tempfile
-import hashlib
+import sys
+from dataclasses import dataclass
+from functools import cache
 from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Any, Callable
+from urllib.parse import urlsplit
 
-import httpx
+from opavm import _http, _io
+from opavm.errors import ChecksumMismatchError, DownloadError
 
-from opavm.errors import DownloadError
+if TYPE_CHECKING:
+    import hashlib
+
+    import httpx
+
+
+@cache
+def _get_blake3() -> Any:
+    # Loaded on first use so shim runs, which import this module, never pay for it.
+    try:
+        from blake3 import blake3
+    except ImportError:  # blake3 is an optional speedup (`pip install opavm[fast]`).
+        return None
+    return blake3
+
+
+@dataclass
+class DownloadResult:
+    sha256: str | None = None
+    blake3: str | None = None
+
+
+_RANGE_WORKERS = 4
+# Smaller artifacts finish faster over one connection than the probe plus fan-out costs.
+_RANGE_MIN_BYTES = 4 * 1024 * 1024
+
+
+class _RangeNotSatisfiedError(Exception):
+    """Raised when a server answers a Range request with the full body."""
+
+
+def _preallocate(fd: int, size: int) -> None:
+    # Reserving the full extent up front avoids per-chunk allocation and fragmentation.
+    if size <= 0 or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError:
+        # Not every filesystem supports it; plain writes still grow the file.
+        return
+
+
+def _probe_ranged_size(client: httpx.Client, url: str) -> int | None:
+    httpx = _http.get_httpx()
+    try:
+        response = client.head(url)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    if response.headers.get("Accept-Ranges", "").lower() != "bytes":
+        return None
+    total_header = response.headers.get("Content-Length")
+    if not total_header or not total_header.isdigit():
+        return None
+    total_bytes = int(total_header)
+    return total_bytes if total_bytes >= _RANGE_MIN_BYTES else None
+
+
+def _range_segments(total_bytes: int, workers: int) -> list[tuple[int, int]]:
+    size = -(-total_bytes // workers)
+    return [(start, min(start + size, total_bytes) - 1) for start in range(0, total_bytes, size)]
+
+
+def _download_ranges(
+    client: httpx.Client,
+    url: str,
+    temp_path: Path,
+    total_bytes: int,
+    on_progress: Callable[[int | None, int], None] | None,
+    timeout: float,
+) -> bool:
+    # Imported here so resolving a version (every shim run) doesn't load the thread pool.
+    import threading
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    with temp_path.open("r+b") as fh:
+        fh.truncate(total_bytes)
+        _preallocate(fh.fileno(), total_bytes)
+
+    lock = threading.Lock()
+    abort = threading.Event()
+    downloaded_bytes = 0
+    if on_progress is not None:
+        on_progress(total_bytes, downloaded_bytes)
+
+    def fetch_segment(start: int, end: int) -> None:
+        nonlocal downloaded_bytes
+        headers = {"Range": f"bytes={start}-{end}"}
+        with client.stream("GET", url, headers=headers, timeout=timeout) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise _RangeNotSatisfiedError
+            written = 0
+            # Each worker owns a handle and a disjoint slice of the file, so writes never contend.
+            with temp_path.open("r+b") as fh:
+                fh.seek(start)
+                for chunk in response.iter_bytes():
+                    if abort.is_set():
+                        return
+                    if chunk:
+                        fh.write(chunk)
+                        written += len(chunk)
+                        with lock:
+                            downloaded_bytes += len(chunk)
+                            if on_progress is not None:
+                                on_progress(total_bytes, downloaded_bytes)
+        if written != end - start + 1:
+            raise DownloadError("Download failed.", f"Incomplete response from: {url}")
+
+    segments = _range_segments(total_bytes, _RANGE_WORKERS)
+    with ThreadPoolExecutor(max_workers=len(segments)) as pool:
+        futures = [pool.submit(fetch_segment, start, end) for start, end in segments]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except _RangeNotSatisfiedError:
+            abort.set()
+            return False
+        except BaseException:
+            abort.set()
+            raise
+
+    with temp_path.open("r+b") as fh:
+        os.fsync(fh.fileno())
+    return True
+
+
+def _download_stream(
+    client: httpx.Client,
+    url: str,
+    temp_path: Path,
+    on_progress: Callable[[int | None, int], None] | None,
+    timeout: float,
+    digest: hashlib._Hash | None = None,
+) -> None:
+    with client.stream("GET", url, timeout=timeout) as response:
+        response.raise_for_status()
+        total_header = response.headers.get("Content-Length")
+        total_bytes = int(total_header) if total_header and total_header.isdigit() else None
+        downloaded_bytes = 0
+        if on_progress is not None:
+            on_progress(total_bytes, downloaded_bytes)
+        with temp_path.open("wb") as fh:
+            if total_bytes:
+                _preallocate(fh.fileno(), total_bytes)
+            for chunk in response.iter_bytes():
+                if chunk:
+                    if digest is not None:
+                        digest.update(chunk)
+                    fh.write(chunk)
+                    downloaded_bytes += len(chunk)
+                    if on_progress is not None:
+                        on_progress(total_bytes, downloaded_bytes)
+            if total_bytes:
+                # Content-Length may describe an encoded body; drop any preallocated tail.
+                fh.truncate(downloaded_bytes)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+
+def _asset_name(url: str) -> str:
+    # Release download URLs end in the asset's file name.
+    return posixpath.basename(urlsplit(url).path) or url
 
 
 def download_binary(
@@ -17,33 +184,46 @@ def download_binary(
     destination: Path,
     timeout: float = 120.0,
     on_progress: Callable[[int | None, int], None] | None = None,
-) -> None:
+    expected_sha256: str | None = None,
+    client: httpx.Client | None = None,
+    expected_blake3: str | None = None,
+) -> DownloadResult:
+    import hashlib
+
+    httpx = _http.get_httpx()
     destination.parent.mkdir(parents=True, exist_ok=True)
 
-    fd, temp_name = tempfile.mkstemp(dir=str(destination.parent), prefix="opa.", suffix=".tmp")
+    fd, temp_name = _io.create_temp(destination.parent, "opa")
     os.close(fd)
     temp_path = Path(temp_name)
+    digest = hashlib.sha256() if expected_sha256 is not None else None
+    actual_sha256: str | None = None
 
     try:
-        with httpx.stream("GET", url, timeout=timeout, follow_redirects=True) as response:
-            response.raise_for_status()
-            total_header = response.headers.get("Content-Length")
-            total_bytes = int(total_header) if total_header and total_header.isdigit() else None
-            downloaded_bytes = 0
-            if on_progress is not None:
-                on_progress(total_bytes, downloaded_bytes)
-            with temp_path.open("wb") as fh:
-                for chunk in response.iter_bytes():
-                    if chunk:
-                        fh.write(chunk)
-                        downloaded_bytes += len(chunk)
-                        if on_progress is not None:
-                            on_progress(total_bytes, downloaded_bytes)
-                fh.flush()
-                os.fsync(fh.fileno())
+        # A shared client carries the shorter API timeout, so binary requests set their own.
+        with _http.borrow_client(client, timeout) as active:
+            ranged_total = _probe_ranged_size(active, url)
+            if ranged_total is not None and _download_ranges(
+                active, url, temp_path, ranged_total, on_progress, timeout
+            ):
+                # Ranges land out of order, so hash the assembled file while it is still cached.
+                if digest is not None:
+                    actual_sha256 = sha256_file(temp_path)
+            else:
+                _download_stream(active, url, temp_path, on_progress, timeout, digest)
+                if digest is not None:
+                    actual_sha256 = digest.hexdigest()
 
+        actual_blake3 = blake3_file(temp_path) if expected_blake3 is not None else None
+        if (expected_sha256 is not None and actual_sha256 != expected_sha256.lower()) or (
+            expected_blake3 is not None and actual_blake3 != expected_blake3.lower()
+        ):
+            raise ChecksumMismatchError(
+                "Checksum verification failed.",
+                f"Downloaded file hash mismatch for {_asset_name(url)}.",
+            )
         temp_path.chmod(temp_path.stat().st_mode | 0o111)
-        os.replace(temp_path, destination)
+        _io.durable_replace(temp_path, destination)
     except httpx.HTTPError as exc:
         raise DownloadError("Download failed.", f"Could not fetch: {url}") from exc
     except OSError as exc:
@@ -51,6 +231,7 @@ def download_binary(
     finally:
         if temp_path.exists():
             temp_path.unlink()
+    return DownloadResult(sha256=actual_sha256, blake3=actual_blake3)
 
 
 def remove_tree(path: Path) -> None:
@@ -58,32 +239,75 @@ def remove_tree(path: Path) -> None:
         shutil.rmtree(path)
 
 
+_HASH_BLOCK_SIZE = 4 * 1024 * 1024
+# Mapping a file that is open elsewhere is unreliable on Windows; buffered reads are used there.
+_USE_MMAP = sys.platform != "win32"
+# First whitespace-delimited token of a line that is exactly 64 hex digits.
+_SHA256_LINE = re.compile(r"(?m)^[ \t]*([0-9a-fA-F]{64})(?=\s|$)")
+_SHA256_LINE_BYTES = re.compile(rb"(?m)^[ \t]*([0-9a-fA-F]{64})(?=\s|$)")
+
+
 def sha256_file(path: Path) -> str:
-    digest = hashlib.sha256()
+    import hashlib
+    import mmap
+
     with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return hashlib.sha256().hexdigest()
+        if _USE_MMAP:
+            try:
+                with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+                    # Hash straight out of the page cache; the kernel reads ahead sequentially.
+                    if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    return hashlib.sha256(mapped).hexdigest()
+            except (OSError, ValueError):
+                # Some filesystems cannot be mapped; fall through to buffered reads.
+                pass
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        # Python 3.10: reuse one buffer instead of allocating a bytes object per block.
+        digest = hashlib.sha256()
+        buffer = bytearray(_HASH_BLOCK_SIZE)
+        view = memoryview(buffer)
         while True:
-            chunk = f.read(1024 * 1024)
-            if not chunk:
+            size = f.readinto(buffer)
+            if not size:
                 break
-            digest.update(chunk)
+            digest.update(view[:size])
     return digest.hexdigest()
 
 
-def fetch_text(url: str, timeout: float = 30.0) -> str:
+def blake3_available() -> bool:
+    return _get_blake3() is not None
+
+
+def blake3_file(path: Path) -> str:
+    blake3 = _get_blake3()
+    if blake3 is None:
+        raise DownloadError("BLAKE3 is not available.", "Install with: pip install opavm[fast]")
+    # update_mmap hashes straight from the page cache across all cores.
+    digest = blake3(max_threads=blake3.AUTO)
+    digest.update_mmap(str(path))
+    return digest.hexdigest()
+
+
+def fetch_text(url: str, timeout: float = 30.0, client: httpx.Client | None = None) -> str:
+    httpx = _http.get_httpx()
     try:
-        response = httpx.get(url, timeout=timeout, follow_redirects=True)
-        response.raise_for_status()
-        return response.text
+        with _http.borrow_client(client, timeout) as active:
+            response = active.get(url)
+            response.raise_for_status()
+            return response.text
     except httpx.HTTPError as exc:
         raise DownloadError("Checksum fetch failed.", f"Could not fetch: {url}") from exc
 
 
-def parse_checksum_text(text: str) -> str:
-    for line in text.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        token = line.split()[0]
-        if len(token) == 64 and all(ch in "0123456789abcdefABCDEF" for ch in token):
-            return token.lower()
-    raise DownloadError("Invalid checksum file.", "No SHA256 value found.")
+def parse_checksum_text(text: str | bytes) -> str:
+    pattern = _SHA256_LINE_BYTES if isinstance(text, bytes) else _SHA256_LINE
+    match = pattern.search(text)
+    if match is None:
+        raise DownloadError("Invalid checksum file.", "No SHA256 value found.")
+    value = match.group(1)
+    return (value.decode("ascii") if isinstance(value, bytes) else value).lower()
@@ -39,5 +39,9 @@ class DownloadError(OpavmError):
     pass
 
 
+class ChecksumMismatchError(DownloadError):
+    pass
+
+
 class GitHubLookupError(OpavmError):
     pass
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import contextlib
 import os
-from typing import Sequence
-
-import httpx
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
 
+from opavm import _http, _io, _json, config
 from opavm.errors import GitHubLookupError
 
+if TYPE_CHECKING:
+    import httpx
+
 GITHUB_API_ROOT = "https://api.github.com/repos"
+# "latest" and release listings move; serve them from cache briefly before revalidating.
+CACHE_MAX_AGE_SECONDS = 300.0
 
 
 @dataclass
@@ -22,6 +29,13 @@ class ReleaseInfo:
     version: str
     tag: str
     assets: list[ReleaseAsset]
+    assets_by_name: dict[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # First asset wins on duplicate names, matching the old in-order scan.
+        self.assets_by_name = {}
+        for asset in self.assets:
+            self.assets_by_name.setdefault(asset.name, asset.url)
 
 
 @dataclass
@@ -41,6 +55,7 @@ def _github_headers() -> dict[str, str]:
 
 
 def _raise_friendly_http_error(exc: httpx.HTTPError) -> GitHubLookupError:
+    httpx = _http.get_httpx()
     if isinstance(exc, httpx.ProxyError):
         return GitHubLookupError(
             "Failed to query GitHub releases.",
@@ -78,6 +93,79 @@ def _raise_friendly_http_error(exc: httpx.HTTPError) -> GitHubLookupError:
     )
 
 
+def _cache_path(repo: str, key: str) -> Path:
+    return config.base_dir() / "cache" / "github" / repo / f"{key}.json"
+
+
+def _cache_get(repo: str, key: str) -> dict[str, Any] | None:
+    try:
+        entry = _json.loads(_cache_path(repo, key).read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or "payload" not in entry:
+        return None
+    return entry
+
+
+def _cache_put(repo: str, key: str, etag: str | None, payload: Any) -> None:
+    path = _cache_path(repo, key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = _io.create_temp(path.parent, key)
+        try:
+            try:
+                _io.write_all(
+                    fd, _json.dumps({"etag": etag, "fetched_at": time.time(), "payload": payload})
+                )
+            finally:
+                os.close(fd)
+            os.replace(tmp_name, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_name)
+            raise
+    except OSError:
+        # The cache only saves requests; an unwritable home must not fail the command.
+        return
+
+
+def _get_json(
+    url: str,
+    timeout: float,
+    repo: str,
+    cache_key: str,
+    max_age: float | None = None,
+    client: httpx.Client | None = None,
+) -> Any:
+    cached = _cache_get(repo, cache_key)
+    if cached is not None and max_age is not None:
+        fetched_at = cached.get("fetched_at")
+        if isinstance(fetched_at, (int, float)) and time.time() - fetched_at < max_age:
+            return cached["payload"]
+
+    httpx = _http.get_httpx()
+    headers = _github_headers()
+    etag = cached.get("etag") if cached is not None else None
+    if isinstance(etag, str) and etag:
+        headers["If-None-Match"] = etag
+
+    try:
+        with _http.borrow_client(client, timeout) as active:
+            response = active.get(url, headers=headers)
+            if response.status_code == 304 and cached is not None:
+                # Only a max-age lookup reads fetched_at, so only it needs the entry refreshed.
+                if max_age is not None:
+                    _cache_put(repo, cache_key, etag, cached["payload"])
+                return cached["payload"]
+            response.raise_for_status()
+            payload = _json.loads(response.content)
+    except httpx.HTTPError as exc:
+        raise _raise_friendly_http_error(exc) from exc
+
+    _cache_put(repo, cache_key, response.headers.get("ETag"), payload)
+    return payload
+
+
 def configured_repo(
     default_repo: str = "open-policy-agent/opa",
 ) -> str:
@@ -106,7 +194,7 @@ def releases_api_url(repo: str) -> str:
     return f"{GITHUB_API_ROOT}/{repo}/releases"
 
 
-def _normalize_tag(version: str) -> str:
+def normalize_tag(version: str) -> str:
     if version == "latest":
         return version
     if version.startswith("v"):
@@ -114,23 +202,27 @@ def _normalize_tag(version: str) -> str:
     return f"v{version}"
 
 
-def _version_from_tag(tag: str) -> str:
+def version_from_tag(tag: str) -> str:
     return tag[1:] if tag.startswith("v") else tag
 
 
-def fetch_release(version: str, timeout: float = 30.0, repo: str | None = None) -> ReleaseInfo:
-    tag = _normalize_tag(version)
+def fetch_release(
+    version: str,
+    timeout: float = 30.0,
+    repo: str | None = None,
+    client: httpx.Client | None = None,
+) -> ReleaseInfo:
+    tag = normalize_tag(version)
     selected_repo = validate_repo(repo) if repo else configured_repo()
     base_url = releases_api_url(selected_repo)
-    url = f"{base_url}/latest" if version == "latest" else f"{base_url}/tags/{tag}"
-
-    try:
-        with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-            response = client.get(url, headers=_github_headers())
-            response.raise_for_status()
-            payload = response.json()
-    except httpx.HTTPError as exc:
-        raise _raise_friendly_http_error(exc) from exc
+    if version == "latest":
+        url = f"{base_url}/latest"
+        payload = _get_json(
+            url, timeout, selected_repo, "latest", max_age=CACHE_MAX_AGE_SECONDS, client=client
+        )
+    else:
+        url = f"{base_url}/tags/{tag}"
+        payload = _get_json(url, timeout, selected_repo, f"tags-{tag}", client=client)
 
     release_tag = payload.get("tag_name")
     if not release_tag:
@@ -141,27 +233,30 @@ def fetch_release(version: str, timeout: float = 30.0, repo: str | None = None)
         for item in payload.get("assets", [])
         if "name" in item and "browser_download_url" in item
     ]
-    return ReleaseInfo(version=_version_from_tag(release_tag), tag=release_tag, assets=assets)
+    return ReleaseInfo(version=version_from_tag(release_tag), tag=release_tag, assets=assets)
 
 
 def fetch_recent_releases(
     limit: int = 10,
     timeout: float = 30.0,
     repo: str | None = None,
+    client: httpx.Client | None = None,
 ) -> list[ReleaseSummary]:
     if limit < 1:
         raise GitHubLookupError("Limit must be at least 1.", "Try: opavm releases --limit 10")
 
     selected_repo = validate_repo(repo) if repo else configured_repo()
     base_url = releases_api_url(selected_repo)
-    url = f"{base_url}?per_page={min(limit, 100)}"
-    try:
-        with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-            response = client.get(url, headers=_github_headers())
-            response.raise_for_status()
-            payload = response.json()
-    except httpx.HTTPError as exc:
-        raise _raise_friendly_http_error(exc) from exc
+    per_page = min(limit, 100)
+    url = f"{base_url}?per_page={per_page}"
+    payload = _get_json(
+        url,
+        timeout,
+        selected_repo,
+        f"releases-{per_page}",
+        max_age=CACHE_MAX_AGE_SECONDS,
+        client=client,
+    )
 
     if not isinstance(payload, list):
         raise GitHubLookupError("Invalid GitHub response.", "Expected release list.")
@@ -173,7 +268,7 @@ def fetch_recent_releases(
             continue
         releases.append(
             ReleaseSummary(
-                version=_version_from_tag(tag),
+                version=version_from_tag(tag),
                 tag=tag,
                 published_at=str(item.get("published_at") or ""),
                 prerelease=bool(item.get("prerelease")),
@@ -187,21 +282,14 @@ def fetch_recent_releases(
 
 def pick_asset_url(release: ReleaseInfo, expected_names: Sequence[str]) -> str:
     for expected_name in expected_names:
-        for asset in release.assets:
-            if asset.name == expected_name:
-                return asset.url
+        url = release.assets_by_name.get(expected_name)
+        if url:
+            return url
     expected = ", ".join(expected_names)
     raise GitHubLookupError(f"No matching asset found for {expected}.", "Check available release assets.")
 
 
-def checksum_asset_url(release: ReleaseInfo, asset_name: str) -> str | None:
-    checksum_name = f"{asset_name}.sha256"
-    raw_assets = getattr(release, "assets", [])
-    try:
-        assets = list(raw_assets)
-    except TypeError:
-        return None
-    for asset in assets:
-        if asset.name == checksum_name:
-            return asset.url
-    return None
+def checksum_asset_url(
+    release: ReleaseInfo, asset_name: str, algorithm: str = "sha256"
+) -> str | None:
+    return release.assets_by_name.get(f"{asset_name}.{algorithm}")
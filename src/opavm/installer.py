@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import contextlib
+import os
 import subprocess
 from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
-from opavm import catalog, config, download, github, platform
+from opavm import _http, catalog, config, download, github, platform
 from opavm.errors import OpavmError, VersionNotInstalledError
 
+if TYPE_CHECKING:
+    import httpx
+
 StatusCallback = Callable[[str], None]
 DownloadProgressCallback = Callable[[int | None, int], None]
 
+_HTTP_TIMEOUT = 30.0
+_DOWNLOAD_TIMEOUT = 120.0
+
 
 def _tool_versions_dir(tool: str) -> Path:
     return config.tool_versions_dir(tool)
@@ -31,14 +39,19 @@ def _asset_candidates(tool: str, os_name: str, arch: str) -> list[str]:
 def installed_versions(tool: str = "opa") -> list[str]:
     spec = catalog.get_tool(tool)
     root = _tool_versions_dir(spec.name)
-    if not root.exists():
-        return []
     versions: list[str] = []
-    for entry in root.iterdir():
-        if not entry.is_dir():
-            continue
-        if (entry / spec.binary_base).exists() or (entry / f"{spec.binary_base}.exe").exists():
-            versions.append(entry.name)
+    try:
+        entries = os.scandir(root)
+    except FileNotFoundError:
+        return []
+    # DirEntry caches the file type from the directory read, so only the binary probe stats.
+    with entries:
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            binary = os.path.join(entry.path, spec.binary_base)
+            if os.path.exists(binary) or os.path.exists(f"{binary}.exe"):
+                versions.append(entry.name)
     return sorted(versions)
 
 
@@ -78,6 +91,28 @@ def install(
     tool: str = "opa",
     on_status: StatusCallback | None = None,
     on_download: DownloadProgressCallback | None = None,
+) -> str:
+    spec = catalog.get_tool(tool)
+    # An exact tag that is already on disk needs no release lookup at all.
+    if version != "latest":
+        candidate = github.version_from_tag(github.normalize_tag(version))
+        if is_installed(candidate, tool=spec.name):
+            if on_status is not None:
+                on_status("already_installed")
+            return candidate
+
+    # One client per install lets the release lookup, checksum and binary fetches reuse
+    # connections instead of paying a TLS handshake each.
+    with _http.new_client(timeout=_HTTP_TIMEOUT) as client:
+        return _install(version, spec.name, on_status, on_download, client)
+
+
+def _install(
+    version: str,
+    tool: str,
+    on_status: StatusCallback | None,
+    on_download: DownloadProgressCallback | None,
+    client: httpx.Client,
 ) -> str:
     spec = catalog.get_tool(tool)
     config.ensure_layout()
@@ -86,7 +121,7 @@ def install(
 
     os_name, arch = platform.normalized_os_arch()
     repo = spec.default_repo
-    release = github.fetch_release(version, repo=repo)
+    release = github.fetch_release(version, repo=repo, client=client)
     resolved_version = release.version
 
     if is_installed(resolved_version, tool=spec.name):
@@ -95,38 +130,50 @@ def install(
         return resolved_version
 
     expected_assets = _asset_candidates(spec.name, os_name, arch)
-    raw_assets = getattr(release, "assets", [])
-    try:
-        assets = list(raw_assets)
-    except TypeError:
-        assets = []
-    selected_asset_name = ""
-    for candidate in expected_assets:
-        for asset in assets:
-            if asset.name == candidate:
-                selected_asset_name = candidate
-                break
-        if selected_asset_name:
-            break
-    if not selected_asset_name and expected_assets:
-        selected_asset_name = expected_assets[0]
+    selected_asset_name = next(
+        (candidate for candidate in expected_assets if candidate in release.assets_by_name),
+        expected_assets[0] if expected_assets else "",
+    )
     asset_url = github.pick_asset_url(release, expected_assets)
 
+    # The checksum file is tiny; fetching it first lets the download verify in-stream and
+    # never place a binary whose hash does not match.
+    # A published BLAKE3 sum is preferred when the blake3 extra is installed: it hashes
+    # several times faster than SHA-256 on large binaries.
+    expected_sha256 = None
+    expected_blake3 = None
+    blake3_url = None
+    if download.blake3_available():
+        blake3_url = github.checksum_asset_url(release, selected_asset_name, algorithm="blake3")
+    if blake3_url:
+        expected_blake3 = download.parse_checksum_text(
+            download.fetch_text(blake3_url, client=client)
+        )
+    else:
+        checksum_url = github.checksum_asset_url(release, selected_asset_name)
+        if checksum_url:
+            expected_sha256 = download.parse_checksum_text(
+                download.fetch_text(checksum_url, client=client)
+            )
+
     target = _platform_binary_path(resolved_version, os_name, spec.name)
     if on_status is not None:
         on_status("downloading")
-    download.download_binary(asset_url, target, on_progress=on_download)
-    checksum_url = github.checksum_asset_url(release, selected_asset_name)
-    if checksum_url:
-        if on_status is not None:
-            on_status("verifying_checksum")
-        expected_checksum = download.parse_checksum_text(download.fetch_text(checksum_url))
-        actual_checksum = download.sha256_file(target)
-        if expected_checksum != actual_checksum:
-            raise OpavmError(
-                "Checksum verification failed.",
-                f"Downloaded file hash mismatch for {selected_asset_name}.",
-            )
+    try:
+        download.download_binary(
+            asset_url,
+            target,
+            timeout=_DOWNLOAD_TIMEOUT,
+            on_progress=on_download,
+            expected_sha256=expected_sha256,
+            client=client,
+            expected_blake3=expected_blake3,
+        )
+    except OpavmError:
+        # Don't leave an empty version directory behind for installed_versions to skip over.
+        with contextlib.suppress(OSError):
+            target.parent.rmdir()
+        raise
     if on_status is not None:
         on_status("verifying")
     verify_binary(target)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import platform
+from functools import cache
 
 from opavm.errors import UnsupportedPlatformError
 
 
+@cache
 def normalized_os_arch() -> tuple[str, str]:
     sys_name = platform.system().lower()
     machine = platform.machine().lower()
@@ -38,6 +40,7 @@ def normalized_os_arch() -> tuple[str, str]:
     return os_name, arch
 
 
+@cache
 def asset_name(version: str, os_name: str, arch: str, binary_base: str = "opa") -> str:
     _ = version
     extension = ".exe" if os_name == "windows" else ""
@@ -45,15 +48,20 @@ def asset_name(version: str, os_name: str, arch: str, binary_base: str = "opa")
 
 
 def asset_name_candidates(os_name: str, arch: str, binary_base: str = "opa") -> list[str]:
+    return list(_asset_name_candidates(os_name, arch, binary_base))
+
+
+@cache
+def _asset_name_candidates(os_name: str, arch: str, binary_base: str) -> tuple[str, ...]:
     primary = asset_name("latest", os_name, arch, binary_base=binary_base)
-    candidates = [primary]
 
     # Older arm64 OPA releases expose only static assets on macOS/Linux.
     if binary_base == "opa" and os_name in {"darwin", "linux"} and arch == "arm64":
-        candidates.append(f"opa_{os_name}_{arch}_static")
+        return primary, f"opa_{os_name}_{arch}_static"
 
-    return candidates
+    return (primary,)
 
 
+@cache
 def binary_filename(os_name: str, binary_base: str = "opa") -> str:
     return f"{binary_base}.exe" if os_name == "windows" else binary_base
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 from opavm import catalog, config
@@ -12,13 +13,21 @@ def pin_filename(tool: str = "opa") -> str:
 
 
 def find_pin_file(start: Path, tool: str = "opa") -> Path | None:
-    current = start.resolve()
     filename = pin_filename(tool)
-    for directory in [current, *current.parents]:
-        pin = directory / filename
-        if pin.exists():
-            return pin
-    return None
+    # Walk plain strings rather than Path objects: one stat per level, no per-level Path objects.
+    current = os.path.realpath(start)
+    while True:
+        candidate = os.path.join(current, filename)
+        try:
+            os.stat(candidate)
+        except OSError:
+            pass
+        else:
+            return Path(candidate)
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
 
 
 def resolve_version(start: Path, tool: str = "opa") -> tuple[str, str]:
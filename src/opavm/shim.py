@@ -1,35 +1,73 @@
 from __future__ import annotations
 
+import contextlib
+import os
 from pathlib import Path
+from typing import NamedTuple
 
-from opavm import config, platform
+from opavm import _io, config, platform
+
+# The shims never vary, so their bytes are built once rather than on every call.
+_CMD_SHIM = (
+    b"@echo off\r\n"
+    b"for /f \"delims=\" %%i in ('opavm which') do set \"OPA_BIN=%%i\"\r\n"
+    b"\"%OPA_BIN%\" %*\r\n"
+)
+_POSIX_SHIM = b"""#!/usr/bin/env sh
+set -eu
+resolved="$(opavm which)"
+exec "$resolved" "$@"
+"""
+
+
+class _ShimSpec(NamedTuple):
+    filename: str
+    payload: bytes
+    executable: bool
+
+
+_POSIX_SPEC = _ShimSpec("opa", _POSIX_SHIM, executable=True)
+_SHIM_SPECS = {
+    "windows": _ShimSpec("opa.cmd", _CMD_SHIM, executable=False),
+    "linux": _POSIX_SPEC,
+    "darwin": _POSIX_SPEC,
+}
+
+
+def _is_current(path: Path, payload: bytes) -> bool:
+    try:
+        # A size mismatch settles it without reading the file.
+        return path.stat().st_size == len(payload) and path.read_bytes() == payload
+    except FileNotFoundError:
+        return False
+
+
+def _write_shim(path: Path, payload: bytes, executable: bool = False) -> None:
+    # A shell may exec the shim at any moment, so it is swapped in whole via rename.
+    # 0o666 lets the umask pick the permissions, as a plain file write would.
+    fd, tmp_name = _io.create_temp(path.parent, path.name, mode=0o666)
+    try:
+        try:
+            _io.write_all(fd, payload)
+            if executable:
+                os.fchmod(fd, os.fstat(fd).st_mode | 0o111)
+        finally:
+            os.close(fd)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_name)
+        raise
 
 
 def ensure_shim() -> Path:
     config.ensure_layout()
     os_name, _ = platform.normalized_os_arch()
+    spec = _SHIM_SPECS[os_name]
 
-    if os_name == "windows":
-        shim_path = config.shims_dir() / "opa.cmd"
-        if shim_path.exists():
-            return shim_path
-        content = """@echo off
-for /f "delims=" %%i in ('opavm which') do set "OPA_BIN=%%i"
-"%OPA_BIN%" %*
-"""
-        shim_path.write_text(content, encoding="utf-8")
-        return shim_path
-
-    shim_path = config.shims_dir() / "opa"
-    if shim_path.exists():
-        return shim_path
-    content = """#!/usr/bin/env sh
-set -eu
-resolved="$(opavm which)"
-exec "$resolved" "$@"
-"""
-    shim_path.write_text(content, encoding="utf-8")
-    shim_path.chmod(shim_path.stat().st_mode | 0o111)
+    shim_path = config.shims_dir() / spec.filename
+    if not _is_current(shim_path, spec.payload):
+        _write_shim(shim_path, spec.payload, executable=spec.executable)
     return shim_path
 
 
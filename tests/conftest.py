@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+import sys
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from functools import lru_cache
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from typer.core import TyperGroup
+from typer.main import get_command
+from typer.testing import CliRunner, Result
+
+from opavm import catalog, cli, config, download, github, installer, platform, shim
+
+
+class CommandRunner(CliRunner):
+    """A CliRunner that invokes an already-built command instead of rebuilding it per call.
+
+    typer's ``CliRunner.invoke`` turns the Typer app into a click command tree on every call;
+    this reuses the tree from ``cli_command`` and only borrows the public ``isolation``.
+    Unexpected exceptions propagate so a failing test shows the real traceback.
+    """
+
+    def invoke(  # type: ignore[override]
+        self,
+        command: TyperGroup,
+        args: Sequence[str] | None = None,
+        input: str | bytes | None = None,
+        env: Mapping[str, str | None] | None = None,
+    ) -> Result:
+        exit_code = 0
+        exception: BaseException | None = None
+        exc_info = None
+        with self.isolation(input=input, env=env) as (stdout, stderr, output):
+            try:
+                command.main(args=list(args or ()), prog_name=self.get_default_prog_name(command))
+            except SystemExit as exc:
+                code = exc.code if exc.code is not None else 0
+                exit_code = code if isinstance(code, int) else 1
+                if exit_code != 0:
+                    exception, exc_info = exc, sys.exc_info()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            return Result(
+                runner=self,
+                stdout_bytes=stdout.getvalue(),
+                stderr_bytes=stderr.getvalue(),
+                output_bytes=output.getvalue(),
+                return_value=None,
+                exit_code=exit_code,
+                exception=exception,
+                exc_info=exc_info,
+            )
+
+
+@pytest.fixture(scope="session")
+def runner() -> CommandRunner:
+    return CommandRunner()
+
+
+@pytest.fixture(scope="session")
+def cli_command() -> TyperGroup:
+    """The opavm click command tree, built once for every CLI test."""
+    return get_command(cli.app)
+
+
+class CliStubs:
+    """Recording stand-ins for the installer/shim/GitHub calls the CLI commands make."""
+
+    def __init__(self) -> None:
+        self.installed = True
+        self.install_result: str | None = None
+        self.releases: list[github.ReleaseSummary] = []
+        self.install_calls: list[tuple[tuple[Any, ...], dict[str, Any]]] = []
+        self.binary_path_calls: list[tuple[str, str]] = []
+        self.shim_calls = 0
+
+    def is_installed(self, _version: str, tool: str = "opa") -> bool:
+        return self.installed
+
+    def install(self, *args: Any, **kwargs: Any) -> str:
+        self.install_calls.append((args, kwargs))
+        return self.install_result or args[0]
+
+    @property
+    def installed_tools(self) -> list[tuple[str, str]]:
+        return [(kwargs["tool"], args[0]) for args, kwargs in self.install_calls]
+
+    def binary_path(self, version: str, tool: str = "opa") -> Path:
+        self.binary_path_calls.append((version, tool))
+        return Path("/tmp") / tool
+
+    def ensure_shim(self) -> Path:
+        self.shim_calls += 1
+        return Path("/tmp/shims/opa")
+
+    def fetch_recent_releases(self, *_args: Any, **_kwargs: Any) -> list[github.ReleaseSummary]:
+        return self.releases
+
+
+@pytest.fixture
+def cli_stubs(monkeypatch: pytest.MonkeyPatch) -> CliStubs:
+    stubs = CliStubs()
+    monkeypatch.setattr(installer, "is_installed", stubs.is_installed)
+    monkeypatch.setattr(installer, "install", stubs.install)
+    monkeypatch.setattr(installer, "binary_path", stubs.binary_path)
+    monkeypatch.setattr(shim, "ensure_shim", stubs.ensure_shim)
+    monkeypatch.setattr(github, "fetch_recent_releases", stubs.fetch_recent_releases)
+    return stubs
+
+
+class InstallerStubs:
+    """Stand-ins for the release lookup, platform probe and binary check used by installs."""
+
+    def __init__(self) -> None:
+        self.release: github.ReleaseInfo | None = None
+        self.asset_url = "https://example.test/opa"
+        self.fetch_release_calls: list[dict[str, Any]] = []
+        self.asset_candidates: list[list[str]] = []
+        self.verified: list[Path] = []
+
+    def fetch_release(self, _version: str, **kwargs: Any) -> github.ReleaseInfo | None:
+        self.fetch_release_calls.append(kwargs)
+        return self.release
+
+    def pick_asset_url(self, _release: github.ReleaseInfo, expected: Any) -> str:
+        self.asset_candidates.append(list(expected))
+        return self.asset_url
+
+    def verify_binary(self, binary: Path) -> None:
+        self.verified.append(binary)
+
+
+@pytest.fixture
+def installer_stubs(monkeypatch: pytest.MonkeyPatch) -> InstallerStubs:
+    stubs = InstallerStubs()
+    monkeypatch.setattr(platform, "normalized_os_arch", _linux_amd64)
+    monkeypatch.setattr(github, "fetch_release", stubs.fetch_release)
+    monkeypatch.setattr(github, "pick_asset_url", stubs.pick_asset_url)
+    monkeypatch.setattr(installer, "verify_binary", stubs.verify_binary)
+    return stubs
+
+
+def _linux_amd64() -> tuple[str, str]:
+    return "linux", "amd64"
+
+
+class FakeExec:
+    """Records the argv `opavm exec` hands off and exits the way the replaced process would."""
+
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+        self.next_returncode = 0
+
+    def execv(self, path: str, argv: list[str]) -> None:
+        assert argv[0] == path
+        self.calls.append(list(argv))
+        raise SystemExit(self.next_returncode)
+
+    def run(self, argv: list[str], check: bool = False) -> SimpleNamespace:
+        self.calls.append(list(argv))
+        return SimpleNamespace(returncode=self.next_returncode)
+
+
+@pytest.fixture
+def fake_exec(monkeypatch: pytest.MonkeyPatch) -> FakeExec:
+    fake = FakeExec()
+    # POSIX replaces the process with execv; Windows waits on subprocess.run.
+    monkeypatch.setattr(os, "execv", fake.execv)
+    monkeypatch.setattr(subprocess, "run", fake.run)
+    return fake
+
+
+def _write_pin(path: Path, version: str) -> None:
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, f"{version}\n".encode("ascii"))
+    finally:
+        os.close(fd)
+
+
+@pytest.fixture(scope="session")
+def write_pin() -> Callable[[Path, str], None]:
+    """Write a pin file holding ``version`` without going through a text codec."""
+    return _write_pin
+
+
+@pytest.fixture
+def installed_binary(tmp_path: Path, opavm_home: Path) -> Callable[..., Path]:
+    """Pin ``version`` in ``tmp_path`` and place a fake binary for it under ``opavm_home``."""
+
+    def make(version: str, tool: str = "opa") -> Path:
+        _write_pin(tmp_path / catalog.get_tool(tool).pin_filename, version)
+        binary = installer.binary_path(version, tool=tool)
+        binary.parent.mkdir(parents=True, exist_ok=True)
+        binary.write_text("fake", encoding="utf-8")
+        return binary
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def ro_workspace(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """An empty directory shared by tests that only read from their working directory."""
+    return tmp_path_factory.mktemp("opavm_help")
+
+
+@pytest.fixture(scope="session")
+def opa_release_0_62_1() -> github.ReleaseInfo:
+    return github.ReleaseInfo(
+        version="0.62.1",
+        tag="v0.62.1",
+        assets=[
+            github.ReleaseAsset(name="opa_linux_amd64", url="https://example.test/opa"),
+            github.ReleaseAsset(name="opa_linux_amd64.sha256", url="https://example.test/opa.sha256"),
+        ],
+    )
+
+
+@pytest.fixture(scope="session")
+def checksum_of() -> Callable[[bytes], str]:
+    @lru_cache(maxsize=64)
+    def sha256_hex(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    return sha256_hex
+
+
+class FakeDownloadModule:
+    """Drop-in for ``opavm.download`` as the installer uses it: no network, digests recorded.
+
+    Set ``error`` to make ``download_binary`` fail the way the real one does, after it has
+    created the version directory.
+    """
+
+    DownloadResult = download.DownloadResult
+    parse_checksum_text = staticmethod(download.parse_checksum_text)
+    remove_tree = staticmethod(download.remove_tree)
+
+    def __init__(self, payload: bytes = b"bin") -> None:
+        self.payload = payload
+        self.sha_text = ""
+        self.error: Exception | None = None
+        self.download_calls: list[dict[str, Any]] = []
+
+    def blake3_available(self) -> bool:
+        return False
+
+    def fetch_text(self, _url: str, **_kwargs: Any) -> str:
+        return self.sha_text
+
+    def download_binary(
+        self,
+        url: str,
+        destination: Path,
+        on_progress: Callable[[int | None, int], None] | None = None,
+        expected_sha256: str | None = None,
+        expected_blake3: str | None = None,
+        **kwargs: Any,
+    ) -> download.DownloadResult:
+        self.download_calls.append(
+            {
+                "url": url,
+                "expected_sha256": expected_sha256,
+                "expected_blake3": expected_blake3,
+                **kwargs,
+            }
+        )
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if self.error is not None:
+            raise self.error
+        destination.write_bytes(self.payload)
+        if on_progress is not None:
+            on_progress(len(self.payload), len(self.payload))
+        return download.DownloadResult(sha256=hashlib.sha256(self.payload).hexdigest())
+
+
+@pytest.fixture
+def fake_download(monkeypatch: pytest.MonkeyPatch) -> FakeDownloadModule:
+    fake = FakeDownloadModule()
+    monkeypatch.setattr(installer, "download", fake)
+    return fake
+
+
+@pytest.fixture
+def opavm_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point OPAVM_HOME at a per-test directory so tests never share state (or xdist workers)."""
+    home = tmp_path / ".opavm"
+    monkeypatch.setenv("OPAVM_HOME", str(home))
+    return home
+
+
+@pytest.fixture(autouse=True)
+def _reset_opavm_caches() -> Iterator[None]:
+    """Drop process-wide memos so each test sees its own home, cwd and platform."""
+
+    def reset() -> None:
+        config._STATE_CACHE = None
+        config.reset_path_cache()
+        platform.normalized_os_arch.cache_clear()
+        cli._cwd = None
+
+    reset()
+    yield
+    reset()
+
+
+@pytest.fixture(autouse=True)
+def clean_github_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    # A token in the developer's shell would otherwise add an Authorization header to fakes.
+    monkeypatch.delenv("OPAVM_GITHUB_TOKEN", raising=False)
@@ -3,10 +3,9 @@ from __future__ import annotations
 from pathlib import Path
 
 import httpx
+from typer.core import TyperGroup
 from typer.testing import CliRunner
 
-from opavm import cli
-
 
 class _RateLimitedClient:
     def __init__(self, *_args, **_kwargs) -> None:
@@ -57,35 +56,38 @@ class _ConnectErrorClient:
         raise httpx.ConnectError("connect failure", request=request)
 
 
-def test_cli_releases_rate_limited_message(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_releases_rate_limited_message(
+    tmp_path: Path, monkeypatch, opavm_home: Path, runner: CliRunner, cli_command: TyperGroup
+) -> None:
     monkeypatch.chdir(tmp_path)
-    monkeypatch.setattr("opavm.github.httpx.Client", _RateLimitedClient)
+    monkeypatch.setattr("httpx.Client", _RateLimitedClient)
 
-    result = runner.invoke(cli.app, ["releases", "--limit", "1"])
+    result = runner.invoke(cli_command, ["releases", "--limit", "1"])
 
     assert result.exit_code == 1
     assert "rate limit" in result.output.lower()
 
 
-def test_cli_releases_proxy_error_message(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_releases_proxy_error_message(
+    tmp_path: Path, monkeypatch, opavm_home: Path, runner: CliRunner, cli_command: TyperGroup
+) -> None:
     monkeypatch.chdir(tmp_path)
-    monkeypatch.setattr("opavm.github.httpx.Client", _ProxyErrorClient)
+    monkeypatch.setattr("httpx.Client", _ProxyErrorClient)
 
-    result = runner.invoke(cli.app, ["releases", "--limit", "1"])
+    result = runner.invoke(cli_command, ["releases", "--limit", "1"])
 
     assert result.exit_code == 1
     assert "proxy" in result.output.lower()
 
 
-def test_cli_install_network_fault_message(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_install_network_fault_message(
+    tmp_path: Path, monkeypatch, opavm_home: Path, runner: CliRunner, cli_command: TyperGroup
+) -> None:
     monkeypatch.chdir(tmp_path)
-    monkeypatch.setattr("opavm.github.httpx.Client", _ConnectErrorClient)
+    monkeypatch.setattr("httpx.Client", _ConnectErrorClient)
     monkeypatch.setattr("opavm.installer.platform.normalized_os_arch", lambda: ("linux", "amd64"))
 
-    result = runner.invoke(cli.app, ["install", "latest"])
+    result = runner.invoke(cli_command, ["install", "latest"])
 
     assert result.exit_code == 1
     assert "network" in result.output.lower() or "connect" in result.output.lower()
@@ -1,85 +1,91 @@
 from __future__ import annotations
 
 from pathlib import Path
-from unittest import mock
 
+import pytest
+import typer
+from typer.core import TyperGroup
 from typer.testing import CliRunner
 
-from opavm import cli, github, installer
+from opavm import cli, github
 
 
-def test_cli_root_help_includes_tool_selection(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+@pytest.fixture
+def project_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """chdir into tmp_path for commands called directly; the memoized cwd is reset per test."""
     monkeypatch.chdir(tmp_path)
+    return tmp_path
 
-    result = runner.invoke(cli.app, ["--help"])
 
-    assert result.exit_code == 0
-    assert "Tool Selection" in result.output
-    assert "--tool" in result.output
-    assert "opa" in result.output
-    assert "regal" in result.output
+def _help_text(command, capsys: pytest.CaptureFixture[str], parent=None) -> str:
+    # Rich-formatted help is printed rather than returned, so read it back from stdout.
+    command.get_help(typer.Context(command, info_name=command.name or "opavm", parent=parent))
+    return capsys.readouterr().out
 
 
-def test_cli_current_smoke(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
-    monkeypatch.chdir(tmp_path)
+def test_cli_root_help_includes_tool_selection(
+    cli_command: TyperGroup, capsys: pytest.CaptureFixture[str]
+) -> None:
+    output = _help_text(cli_command, capsys)
 
-    (tmp_path / ".opa-version").write_text("0.62.1\n", encoding="utf-8")
+    assert "Tool Selection" in output
+    assert "--tool" in output
+    assert "opa" in output
+    assert "regal" in output
 
-    result = runner.invoke(cli.app, ["current"])
-    assert result.exit_code == 0
-    assert "OPA 0.62.1" in result.output
 
+def test_cli_current_smoke(
+    project_dir: Path, write_pin, capsys: pytest.CaptureFixture[str]
+) -> None:
+    write_pin(project_dir / ".opa-version", "0.62.1")
 
-def test_cli_which_smoke(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
-    monkeypatch.chdir(tmp_path)
+    cli.current(tool="opa")
 
-    opavm_home = tmp_path / ".opavm"
-    monkeypatch.setenv("OPAVM_HOME", str(opavm_home))
+    assert "OPA 0.62.1" in capsys.readouterr().out
+
+
+def test_cli_which_smoke(
+    tmp_path: Path, monkeypatch, runner: CliRunner, cli_command: TyperGroup, installed_binary
+) -> None:
+    monkeypatch.chdir(tmp_path)
 
-    (tmp_path / ".opa-version").write_text("0.62.1\n", encoding="utf-8")
-    binary = installer.binary_path("0.62.1")
-    binary.parent.mkdir(parents=True)
-    binary.write_text("fake", encoding="utf-8")
+    binary = installed_binary("0.62.1")
 
-    result = runner.invoke(cli.app, ["which"])
+    result = runner.invoke(cli_command, ["which"])
     assert result.exit_code == 0
     assert str(binary.resolve()) in result.output
 
 
-def test_cli_exec_forwards_args_and_exit_code(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_exec_forwards_args_and_exit_code(
+    tmp_path: Path,
+    monkeypatch,
+    runner: CliRunner,
+    cli_command: TyperGroup,
+    fake_exec,
+    installed_binary,
+) -> None:
     monkeypatch.chdir(tmp_path)
 
-    opavm_home = tmp_path / ".opavm"
-    monkeypatch.setenv("OPAVM_HOME", str(opavm_home))
+    binary = installed_binary("0.62.1")
+    fake_exec.next_returncode = 7
 
-    (tmp_path / ".opa-version").write_text("0.62.1\n", encoding="utf-8")
-    binary = installer.binary_path("0.62.1")
-    binary.parent.mkdir(parents=True)
-    binary.write_text("fake", encoding="utf-8")
-
-    with mock.patch("opavm.cli.subprocess.run", return_value=mock.Mock(returncode=7)) as run_mock:
-        result = runner.invoke(cli.app, ["exec", "--", "version"])
+    result = runner.invoke(cli_command, ["exec", "--", "version"])
 
     assert result.exit_code == 7
-    run_mock.assert_called_once_with([str(binary), "version"])
+    assert fake_exec.calls == [[str(binary), "version"]]
 
 
-def test_cli_pin_prompts_install_for_missing_version(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_pin_prompts_install_for_missing_version(
+    tmp_path: Path, monkeypatch, runner: CliRunner, cli_command: TyperGroup, cli_stubs
+) -> None:
     monkeypatch.chdir(tmp_path)
+    cli_stubs.installed = False
 
-    with mock.patch("opavm.cli.installer.is_installed", return_value=False), mock.patch(
-        "opavm.cli.installer.install", return_value="0.61.0"
-    ) as install_mock:
-        result = runner.invoke(cli.app, ["pin", "0.61.0"], input="y\n")
+    result = runner.invoke(cli_command, ["pin", "0.61.0"], input="y\n")
 
     assert result.exit_code == 0
-    assert install_mock.call_count == 1
-    args, kwargs = install_mock.call_args
+    assert len(cli_stubs.install_calls) == 1
+    args, kwargs = cli_stubs.install_calls[0]
     assert args == ("0.61.0",)
     assert kwargs["tool"] == "opa"
     assert callable(kwargs["on_status"])
@@ -87,22 +93,22 @@ def test_cli_pin_prompts_install_for_missing_version(tmp_path: Path, monkeypatch
     assert (tmp_path / ".opa-version").read_text(encoding="utf-8") == "0.61.0\n"
 
 
-def test_cli_pin_decline_install_exits_with_error(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_pin_decline_install_exits_with_error(
+    tmp_path: Path, monkeypatch, runner: CliRunner, cli_command: TyperGroup, cli_stubs
+) -> None:
     monkeypatch.chdir(tmp_path)
+    cli_stubs.installed = False
 
-    with mock.patch("opavm.cli.installer.is_installed", return_value=False), mock.patch(
-        "opavm.cli.installer.install"
-    ) as install_mock:
-        result = runner.invoke(cli.app, ["pin", "0.61.0"], input="n\n")
+    result = runner.invoke(cli_command, ["pin", "0.61.0"], input="n\n")
 
     assert result.exit_code == 1
-    install_mock.assert_not_called()
+    assert cli_stubs.install_calls == []
     assert not (tmp_path / ".opa-version").exists()
 
 
-def test_cli_releases_table(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_releases_table(
+    tmp_path: Path, monkeypatch, runner: CliRunner, cli_command: TyperGroup, cli_stubs
+) -> None:
     monkeypatch.chdir(tmp_path)
     releases_data = [
         github.ReleaseSummary(
@@ -112,8 +118,9 @@ def test_cli_releases_table(tmp_path: Path, monkeypatch) -> None:
             prerelease=False,
         )
     ]
-    with mock.patch("opavm.cli.github.fetch_recent_releases", return_value=releases_data):
-        result = runner.invoke(cli.app, ["releases", "--limit", "1"])
+    cli_stubs.releases = releases_data
+
+    result = runner.invoke(cli_command, ["releases", "--limit", "1"])
 
     assert result.exit_code == 0
     assert result.output.startswith("\n")
@@ -122,8 +129,9 @@ def test_cli_releases_table(tmp_path: Path, monkeypatch) -> None:
     assert "1.2.3" in result.output
 
 
-def test_cli_releases_regal_table_header_link(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_releases_regal_table_header_link(
+    tmp_path: Path, monkeypatch, runner: CliRunner, cli_command: TyperGroup, cli_stubs
+) -> None:
     monkeypatch.chdir(tmp_path)
     releases_data = [
         github.ReleaseSummary(
@@ -133,8 +141,9 @@ def test_cli_releases_regal_table_header_link(tmp_path: Path, monkeypatch) -> No
             prerelease=False,
         )
     ]
-    with mock.patch("opavm.cli.github.fetch_recent_releases", return_value=releases_data):
-        result = runner.invoke(cli.app, ["releases", "--tool", "regal", "--limit", "1"])
+    cli_stubs.releases = releases_data
+
+    result = runner.invoke(cli_command, ["releases", "--tool", "regal", "--limit", "1"])
 
     assert result.exit_code == 0
     assert "Regal Releases" in result.output
@@ -142,24 +151,24 @@ def test_cli_releases_regal_table_header_link(tmp_path: Path, monkeypatch) -> No
     assert "0.38.1" in result.output
 
 
-def test_cli_install_help_includes_tool_and_examples(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
-    monkeypatch.chdir(tmp_path)
+def test_cli_install_help_includes_tool_and_examples(
+    cli_command: TyperGroup, capsys: pytest.CaptureFixture[str]
+) -> None:
+    root = typer.Context(cli_command, info_name="opavm")
+    output = _help_text(cli_command.commands["install"], capsys, parent=root)
 
-    result = runner.invoke(cli.app, ["install", "--help"])
+    assert "--tool" in output
+    assert "Tool Selection" in output
+    assert "Examples" in output
+    assert "opavm install regal 0.38.1" in output
 
-    assert result.exit_code == 0
-    assert "--tool" in result.output
-    assert "Tool Selection" in result.output
-    assert "Examples" in result.output
-    assert "opavm install regal 0.38.1" in result.output
 
+def test_cli_exec_help_shows_opa_commands(
+    ro_workspace: Path, monkeypatch, runner: CliRunner, cli_command: TyperGroup
+) -> None:
+    monkeypatch.chdir(ro_workspace)
 
-def test_cli_exec_help_shows_opa_commands(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
-    monkeypatch.chdir(tmp_path)
-
-    result = runner.invoke(cli.app, ["exec", "--help"])
+    result = runner.invoke(cli_command, ["exec", "--help"])
 
     assert result.exit_code == 0
     assert "Usage: opavm exec -- <opa-args>" in result.output
@@ -168,101 +177,84 @@ def test_cli_exec_help_shows_opa_commands(tmp_path: Path, monkeypatch) -> None:
     assert "test" in result.output
 
 
-def test_cli_use_regal_sets_global_default(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
-    monkeypatch.chdir(tmp_path)
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
-
-    with mock.patch("opavm.cli.installer.is_installed", return_value=True):
-        result = runner.invoke(cli.app, ["use", "0.38.1", "--tool", "regal"])
-
-    assert result.exit_code == 0
-    assert "Global default for Regal set to 0.38.1." in result.output
+def test_cli_use_regal_sets_global_default(
+    project_dir: Path, opavm_home: Path, cli_stubs, capsys: pytest.CaptureFixture[str]
+) -> None:
+    cli.use("0.38.1", tool="regal")
 
+    assert "Global default for Regal set to 0.38.1." in capsys.readouterr().out
 
-def test_cli_pin_regal_writes_regal_pin_file(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
-    monkeypatch.chdir(tmp_path)
 
-    with mock.patch("opavm.cli.installer.is_installed", return_value=True):
-        result = runner.invoke(cli.app, ["pin", "0.38.1", "--tool", "regal"])
+def test_cli_pin_regal_writes_regal_pin_file(project_dir: Path, cli_stubs) -> None:
+    cli.pin("0.38.1", tool="regal")
 
-    assert result.exit_code == 0
-    assert (tmp_path / ".regal-version").read_text(encoding="utf-8") == "0.38.1\n"
+    assert (project_dir / ".regal-version").read_text(encoding="utf-8") == "0.38.1\n"
 
 
-def test_cli_current_regal_smoke(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
-    monkeypatch.chdir(tmp_path)
+def test_cli_current_regal_smoke(
+    project_dir: Path, write_pin, capsys: pytest.CaptureFixture[str]
+) -> None:
+    write_pin(project_dir / ".regal-version", "0.38.1")
 
-    (tmp_path / ".regal-version").write_text("0.38.1\n", encoding="utf-8")
+    cli.current(tool="regal")
 
-    result = runner.invoke(cli.app, ["current", "--tool", "regal"])
-    assert result.exit_code == 0
-    assert "Regal 0.38.1" in result.output
+    assert "Regal 0.38.1" in capsys.readouterr().out
 
 
-def test_cli_which_regal_smoke(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_which_regal_smoke(
+    tmp_path: Path, monkeypatch, runner: CliRunner, cli_command: TyperGroup, installed_binary
+) -> None:
     monkeypatch.chdir(tmp_path)
 
-    opavm_home = tmp_path / ".opavm"
-    monkeypatch.setenv("OPAVM_HOME", str(opavm_home))
+    binary = installed_binary("0.38.1", tool="regal")
 
-    (tmp_path / ".regal-version").write_text("0.38.1\n", encoding="utf-8")
-    binary = installer.binary_path("0.38.1", tool="regal")
-    binary.parent.mkdir(parents=True)
-    binary.write_text("fake", encoding="utf-8")
-
-    result = runner.invoke(cli.app, ["which", "--tool", "regal"])
+    result = runner.invoke(cli_command, ["which", "--tool", "regal"])
     assert result.exit_code == 0
     assert str(binary.resolve()) in result.output
 
 
-def test_cli_exec_regal_forwards_args_and_exit_code(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_exec_regal_forwards_args_and_exit_code(
+    tmp_path: Path,
+    monkeypatch,
+    runner: CliRunner,
+    cli_command: TyperGroup,
+    fake_exec,
+    installed_binary,
+) -> None:
     monkeypatch.chdir(tmp_path)
 
-    opavm_home = tmp_path / ".opavm"
-    monkeypatch.setenv("OPAVM_HOME", str(opavm_home))
-
-    (tmp_path / ".regal-version").write_text("0.38.1\n", encoding="utf-8")
-    binary = installer.binary_path("0.38.1", tool="regal")
-    binary.parent.mkdir(parents=True)
-    binary.write_text("fake", encoding="utf-8")
+    binary = installed_binary("0.38.1", tool="regal")
+    fake_exec.next_returncode = 3
 
-    with mock.patch("opavm.cli.subprocess.run", return_value=mock.Mock(returncode=3)) as run_mock:
-        result = runner.invoke(cli.app, ["exec", "--tool", "regal", "--", "version"])
+    result = runner.invoke(cli_command, ["exec", "--tool", "regal", "--", "version"])
 
     assert result.exit_code == 3
-    run_mock.assert_called_once_with([str(binary), "version"])
+    assert fake_exec.calls == [[str(binary), "version"]]
 
 
-def test_cli_install_regal_invokes_regal_tool(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_install_regal_invokes_regal_tool(
+    tmp_path: Path, monkeypatch, runner: CliRunner, cli_command: TyperGroup, cli_stubs
+) -> None:
     monkeypatch.chdir(tmp_path)
 
-    with mock.patch("opavm.cli._install_with_progress", return_value="0.38.1") as install_mock, mock.patch(
-        "opavm.cli.installer.binary_path", return_value=Path("/tmp/regal")
-    ) as path_mock, mock.patch("opavm.cli.shim.ensure_shim") as shim_mock:
-        result = runner.invoke(cli.app, ["install", "regal", "0.38.1"])
+    result = runner.invoke(cli_command, ["install", "regal", "0.38.1"])
 
     assert result.exit_code == 0
-    install_mock.assert_called_once_with("regal", "0.38.1")
-    path_mock.assert_called_once_with("0.38.1", tool="regal")
-    shim_mock.assert_not_called()
+    assert cli_stubs.installed_tools == [("regal", "0.38.1")]
+    assert cli_stubs.binary_path_calls == [("0.38.1", "regal")]
+    assert cli_stubs.shim_calls == 0
     assert "Installed Regal 0.38.1." in result.output
 
 
-def test_cli_install_tool_without_version_defaults_latest(tmp_path: Path, monkeypatch) -> None:
-    runner = CliRunner()
+def test_cli_install_tool_without_version_defaults_latest(
+    tmp_path: Path, monkeypatch, runner: CliRunner, cli_command: TyperGroup, cli_stubs
+) -> None:
     monkeypatch.chdir(tmp_path)
 
-    with mock.patch("opavm.cli._install_with_progress", return_value="0.38.1") as install_mock, mock.patch(
-        "opavm.cli.installer.binary_path", return_value=Path("/tmp/regal")
-    ), mock.patch("opavm.cli.shim.ensure_shim") as shim_mock:
-        result = runner.invoke(cli.app, ["install", "regal"])
+    cli_stubs.install_result = "0.38.1"
+
+    result = runner.invoke(cli_command, ["install", "regal"])
 
     assert result.exit_code == 0
-    install_mock.assert_called_once_with("regal", "latest")
-    shim_mock.assert_not_called()
+    assert cli_stubs.installed_tools == [("regal", "latest")]
+    assert cli_stubs.shim_calls == 0
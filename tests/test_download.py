@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import httpx
+import pytest
+
+from opavm import download
+from opavm.errors import ChecksumMismatchError
+
+
+def _patch_transport(monkeypatch: pytest.MonkeyPatch, handler) -> list[httpx.Request]:
+    seen: list[httpx.Request] = []
+    real_client = httpx.Client
+
+    def recording_handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return handler(request)
+
+    def client_factory(*args, **kwargs) -> httpx.Client:
+        return real_client(*args, transport=httpx.MockTransport(recording_handler), **kwargs)
+
+    monkeypatch.setattr(httpx, "Client", client_factory)
+    return seen
+
+
+def test_download_binary_fetches_ranges_in_parallel(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(download, "_RANGE_MIN_BYTES", 1)
+    payload = bytes(range(256)) * 40
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "HEAD":
+            return httpx.Response(
+                200, headers={"Accept-Ranges": "bytes", "Content-Length": str(len(payload))}
+            )
+        start, end = request.headers["Range"].removeprefix("bytes=").split("-")
+        return httpx.Response(206, content=payload[int(start) : int(end) + 1])
+
+    seen = _patch_transport(monkeypatch, handler)
+    progress: list[tuple[int | None, int]] = []
+    destination = tmp_path / "bin" / "opa"
+
+    download.download_binary(
+        "https://example.test/opa", destination, on_progress=lambda t, d: progress.append((t, d))
+    )
+
+    assert destination.read_bytes() == payload
+    assert len([r for r in seen if "Range" in r.headers]) == download._RANGE_WORKERS
+    assert progress[-1] == (len(payload), len(payload))
+    assert list(destination.parent.glob("opa.*.tmp")) == []
+
+
+def test_download_binary_falls_back_when_ranges_ignored(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(download, "_RANGE_MIN_BYTES", 1)
+    payload = b"full-body" * 100
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "HEAD":
+            return httpx.Response(
+                200, headers={"Accept-Ranges": "bytes", "Content-Length": str(len(payload))}
+            )
+        return httpx.Response(200, content=payload)
+
+    _patch_transport(monkeypatch, handler)
+    destination = tmp_path / "bin" / "opa"
+
+    download.download_binary("https://example.test/opa", destination)
+
+    assert destination.read_bytes() == payload
+
+
+def test_download_binary_rejects_checksum_mismatch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _patch_transport(monkeypatch, lambda _request: httpx.Response(200, content=b"tampered"))
+    destination = tmp_path / "bin" / "opa"
+
+    with pytest.raises(ChecksumMismatchError) as excinfo:
+        download.download_binary(
+            "https://example.test/download/v0.62.1/opa_linux_amd64",
+            destination,
+            expected_sha256="0" * 64,
+        )
+
+    assert excinfo.value.hint == "Downloaded file hash mismatch for opa_linux_amd64."
+
+    assert not destination.exists()
+    assert list(destination.parent.glob("opa.*.tmp")) == []
+
+
+def test_download_binary_applies_its_timeout_to_a_shared_client(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    seen = _patch_transport(monkeypatch, lambda _request: httpx.Response(200, content=b"hello"))
+
+    with httpx.Client(timeout=30.0) as client:
+        download.download_binary(
+            "https://example.test/opa", tmp_path / "opa", timeout=120.0, client=client
+        )
+
+    get = next(request for request in seen if request.method == "GET")
+    assert get.extensions["timeout"]["read"] == 120.0
+
+
+def test_download_binary_returns_streamed_digest(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _patch_transport(monkeypatch, lambda _request: httpx.Response(200, content=b"hello"))
+    expected = "2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824"
+
+    result = download.download_binary(
+        "https://example.test/opa", tmp_path / "opa", expected_sha256=expected.upper()
+    )
+
+    assert result.sha256 == expected
+
+
+def test_download_binary_verifies_blake3(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    class FakeBlake3:
+        AUTO = -1
+
+        def __init__(self, max_threads: int = 1) -> None:
+            self._digest = hashlib.sha256()
+
+        def update_mmap(self, path: str) -> None:
+            self._digest.update(Path(path).read_bytes())
+
+        def hexdigest(self) -> str:
+            return self._digest.hexdigest()
+
+    monkeypatch.setattr(download, "_get_blake3", lambda: FakeBlake3)
+    _patch_transport(monkeypatch, lambda _request: httpx.Response(200, content=b"hello"))
+    expected = hashlib.sha256(b"hello").hexdigest()
+
+    result = download.download_binary(
+        "https://example.test/opa", tmp_path / "opa", expected_blake3=expected
+    )
+
+    assert result.blake3 == expected
+    assert result.sha256 is None
+    with pytest.raises(ChecksumMismatchError):
+        download.download_binary(
+            "https://example.test/opa", tmp_path / "other", expected_blake3="0" * 64
+        )
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
+from pathlib import Path
+
+import httpx
 import pytest
 
 from opavm import github
 from opavm.errors import GitHubLookupError
 
 
-def test_configured_repo_defaults() -> None:
+def test_configured_repo_defaults_to_opa() -> None:
     assert github.configured_repo() == "open-policy-agent/opa"
 
 
-def test_configured_repo_custom_default() -> None:
+def test_configured_repo_uses_given_default() -> None:
     assert github.configured_repo("StyraInc/regal") == "StyraInc/regal"
 
 
@@ -19,76 +22,97 @@ def test_configured_repo_invalid_default() -> None:
         github.configured_repo("not-valid")
 
 
-def test_fetch_release_uses_explicit_repo(monkeypatch: pytest.MonkeyPatch) -> None:
+@pytest.mark.parametrize(
+    ("fetch", "payload", "url_suffix"),
+    [
+        (
+            lambda repo: github.fetch_release("1.2.3", repo=repo),
+            {"tag_name": "v1.2.3", "assets": []},
+            "/releases/tags/v1.2.3",
+        ),
+        (
+            lambda repo: github.fetch_recent_releases(limit=1, repo=repo)[0],
+            [{"tag_name": "v1.2.3", "published_at": "2026-02-01T00:00:00Z", "prerelease": False}],
+            "/releases?per_page=1",
+        ),
+    ],
+    ids=["fetch_release", "fetch_recent_releases"],
+)
+def test_fetch_uses_explicit_repo(
+    monkeypatch: pytest.MonkeyPatch, opavm_home: Path, fetch, payload, url_suffix: str
+) -> None:
     seen: dict[str, str] = {}
+    real_client = httpx.Client
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["url"] = str(request.url)
+        seen["accept"] = request.headers.get("Accept", "")
+        return httpx.Response(200, json=payload)
+
+    monkeypatch.setattr(
+        httpx,
+        "Client",
+        lambda *args, **kwargs: real_client(
+            *args, transport=httpx.MockTransport(handler), **kwargs
+        ),
+    )
 
-    class FakeResponse:
-        def raise_for_status(self) -> None:
-            return None
-
-        def json(self) -> dict[str, object]:
-            return {"tag_name": "v1.2.3", "assets": []}
-
-    class FakeClient:
-        def __init__(self, *_args, **_kwargs) -> None:
-            return None
-
-        def __enter__(self) -> "FakeClient":
-            return self
-
-        def __exit__(self, _exc_type, _exc, _tb) -> bool:
-            return False
-
-        def get(self, url: str, headers: dict[str, str]) -> FakeResponse:
-            seen["url"] = url
-            seen["accept"] = headers.get("Accept", "")
-            return FakeResponse()
-
-    monkeypatch.setattr(github.httpx, "Client", FakeClient)
-
-    release = github.fetch_release("1.2.3", repo="acme/custom-opa")
-    assert release.version == "1.2.3"
-    assert seen["url"] == "https://api.github.com/repos/acme/custom-opa/releases/tags/v1.2.3"
+    assert fetch("acme/custom-opa").version == "1.2.3"
+    assert seen["url"] == "https://api.github.com/repos/acme/custom-opa" + url_suffix
     assert seen["accept"] == "application/vnd.github+json"
 
 
-def test_fetch_recent_releases_uses_explicit_repo(monkeypatch: pytest.MonkeyPatch) -> None:
-    seen: dict[str, str] = {}
-
-    class FakeResponse:
-        def raise_for_status(self) -> None:
-            return None
+def test_fetch_release_revalidates_with_etag(
+    monkeypatch: pytest.MonkeyPatch, opavm_home: Path
+) -> None:
+    seen: list[httpx.Request] = []
+    real_client = httpx.Client
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.headers.get("If-None-Match") == '"abc"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200, json={"tag_name": "v1.2.3", "assets": []}, headers={"ETag": '"abc"'}
+        )
+
+    monkeypatch.setattr(
+        httpx,
+        "Client",
+        lambda *args, **kwargs: real_client(
+            *args, transport=httpx.MockTransport(handler), **kwargs
+        ),
+    )
 
-        def json(self) -> list[dict[str, object]]:
-            return [
-                {
-                    "tag_name": "v1.2.3",
-                    "published_at": "2026-02-01T00:00:00Z",
-                    "prerelease": False,
-                }
-            ]
+    first = github.fetch_release("1.2.3", repo="acme/custom-opa")
+    second = github.fetch_release("1.2.3", repo="acme/custom-opa")
 
-    class FakeClient:
-        def __init__(self, *_args, **_kwargs) -> None:
-            return None
+    assert first == second
+    assert "If-None-Match" not in seen[0].headers
+    assert seen[1].headers["If-None-Match"] == '"abc"'
 
-        def __enter__(self) -> "FakeClient":
-            return self
 
-        def __exit__(self, _exc_type, _exc, _tb) -> bool:
-            return False
+def test_fetch_latest_release_served_from_fresh_cache(
+    monkeypatch: pytest.MonkeyPatch, opavm_home: Path
+) -> None:
+    calls: list[str] = []
+    real_client = httpx.Client
 
-        def get(self, url: str, headers: dict[str, str]) -> FakeResponse:
-            seen["url"] = url
-            seen["accept"] = headers.get("Accept", "")
-            return FakeResponse()
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        return httpx.Response(200, json={"tag_name": "v1.2.3", "assets": []})
 
-    monkeypatch.setattr(github.httpx, "Client", FakeClient)
+    monkeypatch.setattr(
+        httpx,
+        "Client",
+        lambda *args, **kwargs: real_client(
+            *args, transport=httpx.MockTransport(handler), **kwargs
+        ),
+    )
 
-    releases = github.fetch_recent_releases(limit=1, repo="acme/custom-opa")
-    assert releases[0].version == "1.2.3"
-    assert seen["url"] == "https://api.github.com/repos/acme/custom-opa/releases?per_page=1"
-    assert seen["accept"] == "application/vnd.github+json"
+    assert github.fetch_release("latest", repo="acme/custom-opa").version == "1.2.3"
+    assert github.fetch_release("latest", repo="acme/custom-opa").version == "1.2.3"
+    assert len(calls) == 1
 
 
 def test_pick_asset_url_prefers_first_candidate() -> None:
@@ -1,64 +1,44 @@
 from __future__ import annotations
 
 from pathlib import Path
-from unittest import mock
 
-import pytest
-
-from opavm import config, installer
-
-
-def test_install_layout_and_idempotent(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
-
-    fake_release = mock.Mock(version="0.62.1")
-
-    with mock.patch("opavm.installer.platform.normalized_os_arch", return_value=("linux", "amd64")), mock.patch(
-        "opavm.installer.github.fetch_release", return_value=fake_release
-    ), mock.patch("opavm.installer.github.pick_asset_url", return_value="https://example.test/opa"), mock.patch(
-        "opavm.installer.download.download_binary"
-    ) as mock_download, mock.patch("opavm.installer.verify_binary") as mock_verify:
-        def fake_download(_url: str, destination: Path, on_progress=None) -> None:
-            destination.parent.mkdir(parents=True, exist_ok=True)
-            destination.write_text("bin", encoding="utf-8")
-            if on_progress is not None:
-                on_progress(3, 3)
-
-        mock_download.side_effect = fake_download
-
-        installed = installer.install("0.62.1")
-        assert installed == "0.62.1"
-        assert (config.versions_dir() / "0.62.1" / "opa").exists()
-        assert mock_verify.call_count == 1
-
-        installed_again = installer.install("0.62.1")
-        assert installed_again == "0.62.1"
-        assert mock_download.call_count == 1
-
-
-def test_install_regal_layout(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
-
-    fake_release = mock.Mock(version="0.38.1")
-
-    with mock.patch("opavm.installer.platform.normalized_os_arch", return_value=("linux", "amd64")), mock.patch(
-        "opavm.installer.github.fetch_release", return_value=fake_release
-    ) as fetch_release_mock, mock.patch(
-        "opavm.installer.github.pick_asset_url", return_value="https://example.test/regal"
-    ) as pick_mock, mock.patch("opavm.installer.download.download_binary") as mock_download, mock.patch(
-        "opavm.installer.verify_binary"
-    ):
-        def fake_download(_url: str, destination: Path, on_progress=None) -> None:
-            destination.parent.mkdir(parents=True, exist_ok=True)
-            destination.write_text("bin", encoding="utf-8")
-            if on_progress is not None:
-                on_progress(3, 3)
-
-        mock_download.side_effect = fake_download
-
-        installed = installer.install("0.38.1", tool="regal")
-        assert installed == "0.38.1"
-        assert (config.base_dir() / "tools" / "regal" / "versions" / "0.38.1" / "regal").exists()
-        expected_candidates = ["regal_Linux_x86_64"]
-        assert pick_mock.call_args.args[1] == expected_candidates
-        assert fetch_release_mock.call_args.kwargs["repo"] == "StyraInc/regal"
+from opavm import config, github, installer
+
+
+def test_install_layout_and_idempotent(opavm_home: Path, installer_stubs, fake_download) -> None:
+    installer_stubs.release = github.ReleaseInfo(
+        version="0.62.1",
+        tag="v0.62.1",
+        assets=[github.ReleaseAsset(name="opa_linux_amd64", url="https://example.test/opa")],
+    )
+
+    installed = installer.install("0.62.1")
+    assert installed == "0.62.1"
+    assert (config.versions_dir() / "0.62.1" / "opa").exists()
+    assert len(installer_stubs.verified) == 1
+
+    installed_again = installer.install("0.62.1")
+    assert installed_again == "0.62.1"
+    assert len(fake_download.download_calls) == 1
+    assert len(installer_stubs.fetch_release_calls) == 1
+
+    assert installer.install("v0.62.1") == "0.62.1"
+    assert len(installer_stubs.fetch_release_calls) == 1
+
+
+def test_install_regal_layout(opavm_home: Path, installer_stubs, fake_download) -> None:
+    installer_stubs.release = github.ReleaseInfo(
+        version="0.38.1",
+        tag="v0.38.1",
+        assets=[
+            github.ReleaseAsset(name="regal_Linux_x86_64", url="https://example.test/regal")
+        ],
+    )
+    installer_stubs.asset_url = "https://example.test/regal"
+
+    installed = installer.install("0.38.1", tool="regal")
+    assert installed == "0.38.1"
+    assert (config.base_dir() / "tools" / "regal" / "versions" / "0.38.1" / "regal").exists()
+    assert installer_stubs.asset_candidates == [["regal_Linux_x86_64"]]
+    assert installer_stubs.fetch_release_calls[0]["repo"] == "StyraInc/regal"
+    assert fake_download.download_calls[0]["url"] == "https://example.test/regal"
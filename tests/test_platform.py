@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from unittest import mock
+import platform
+from collections.abc import Callable
 
 import pytest
 
@@ -8,6 +9,15 @@ from opavm.errors import UnsupportedPlatformError
 from opavm.platform import asset_name, asset_name_candidates, binary_filename, normalized_os_arch
 
 
+@pytest.fixture
+def fake_platform(monkeypatch: pytest.MonkeyPatch) -> Callable[[str, str], None]:
+    def set_platform(sys_name: str, machine: str) -> None:
+        monkeypatch.setattr(platform, "system", lambda: sys_name)
+        monkeypatch.setattr(platform, "machine", lambda: machine)
+
+    return set_platform
+
+
 @pytest.mark.parametrize(
     ("sys_name", "machine", "expected"),
     [
@@ -18,19 +28,17 @@ from opavm.platform import asset_name, asset_name_candidates, binary_filename, n
         ("Windows", "x86_64", ("windows", "amd64")),
     ],
 )
-def test_normalized_os_arch_supported(sys_name: str, machine: str, expected: tuple[str, str]) -> None:
-    with mock.patch("platform.system", return_value=sys_name), mock.patch(
-        "platform.machine", return_value=machine
-    ):
-        assert normalized_os_arch() == expected
-
-
-def test_normalized_os_arch_rejects_windows_arm64() -> None:
-    with mock.patch("platform.system", return_value="Windows"), mock.patch(
-        "platform.machine", return_value="arm64"
-    ):
-        with pytest.raises(UnsupportedPlatformError):
-            normalized_os_arch()
+def test_normalized_os_arch_supported(
+    fake_platform, sys_name: str, machine: str, expected: tuple[str, str]
+) -> None:
+    fake_platform(sys_name, machine)
+    assert normalized_os_arch() == expected
+
+
+def test_normalized_os_arch_rejects_windows_arm64(fake_platform) -> None:
+    fake_platform("Windows", "arm64")
+    with pytest.raises(UnsupportedPlatformError):
+        normalized_os_arch()
 
 
 def test_asset_name() -> None:
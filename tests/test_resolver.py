@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 import pytest
@@ -9,72 +10,72 @@ from opavm.errors import VersionNotConfiguredError
 from opavm.resolver import find_pin_file, resolve_version
 
 
-def test_find_pin_file_walks_parents(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.chdir(tmp_path)
-    project = tmp_path / "a" / "b" / "c"
-    project.mkdir(parents=True)
-    pin = tmp_path / "a" / ".opa-version"
-    pin.write_text("0.62.1\n", encoding="utf-8")
-
-    found = find_pin_file(project)
-    assert found == pin
-
-
-def test_find_pin_file_walks_parents_for_regal(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.chdir(tmp_path)
-    project = tmp_path / "a" / "b" / "c"
-    project.mkdir(parents=True)
-    pin = tmp_path / "a" / ".regal-version"
-    pin.write_text("0.38.1\n", encoding="utf-8")
-
-    found = find_pin_file(project, tool="regal")
-    assert found == pin
-
-
-def test_resolve_prefers_pin(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
-    config.set_global_default("opa", "0.60.0")
-
-    pin = tmp_path / ".opa-version"
-    pin.write_text("0.62.1\n", encoding="utf-8")
+@pytest.fixture
+def fake_global_defaults(monkeypatch: pytest.MonkeyPatch) -> dict[str, str]:
+    """Serve global defaults from a dict so resolver tests skip the state file."""
+    store: dict[str, str] = {}
+    monkeypatch.setattr(config, "get_global_default", lambda tool="opa": store.get(tool))
+    return store
 
-    version, reason = resolve_version(tmp_path)
-    assert version == "0.62.1"
-    assert ".opa-version" in reason
 
+def make_tree(root: Path, dirs: list[str], files: dict[str, str]) -> None:
+    for directory in dirs:
+        os.makedirs(root / directory, exist_ok=True)
+    for relative, content in files.items():
+        (root / relative).write_text(content, encoding="utf-8")
 
-def test_resolve_regal_prefers_pin(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
-    config.set_global_default("regal", "0.37.0")
 
-    pin = tmp_path / ".regal-version"
-    pin.write_text("0.38.1\n", encoding="utf-8")
-
-    version, reason = resolve_version(tmp_path, tool="regal")
-    assert version == "0.38.1"
-    assert ".regal-version" in reason
-
-
-def test_resolve_falls_back_to_global(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
-    config.set_global_default("opa", "0.61.0")
-
-    version, reason = resolve_version(tmp_path)
-    assert version == "0.61.0"
-    assert reason == "global default"
+def test_find_pin_file_walks_parents(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    make_tree(tmp_path, ["a/b/c"], {"a/.opa-version": "0.62.1\n"})
 
+    found = find_pin_file(tmp_path / "a" / "b" / "c")
+    assert found == tmp_path / "a" / ".opa-version"
 
-def test_resolve_regal_falls_back_to_global(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
-    config.set_global_default("regal", "0.38.1")
 
-    version, reason = resolve_version(tmp_path, tool="regal")
-    assert version == "0.38.1"
+def test_find_pin_file_walks_parents_for_regal(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    make_tree(tmp_path, ["a/b/c"], {"a/.regal-version": "0.38.1\n"})
+
+    found = find_pin_file(tmp_path / "a" / "b" / "c", tool="regal")
+    assert found == tmp_path / "a" / ".regal-version"
+
+
+@pytest.mark.parametrize(
+    ("tool", "pin_name", "version"),
+    [("opa", ".opa-version", "0.62.1"), ("regal", ".regal-version", "0.38.1")],
+)
+def test_resolve_prefers_pin(
+    tmp_path: Path,
+    fake_global_defaults: dict[str, str],
+    write_pin,
+    tool: str,
+    pin_name: str,
+    version: str,
+) -> None:
+    fake_global_defaults[tool] = "0.37.0"
+
+    pin = tmp_path / pin_name
+    write_pin(pin, version)
+
+    resolved, reason = resolve_version(tmp_path, tool=tool)
+    assert resolved == version
+    assert pin_name in reason
+
+
+@pytest.mark.parametrize(("tool", "version"), [("opa", "0.61.0"), ("regal", "0.38.1")])
+def test_resolve_falls_back_to_global(
+    tmp_path: Path, fake_global_defaults: dict[str, str], tool: str, version: str
+) -> None:
+    fake_global_defaults[tool] = version
+
+    resolved, reason = resolve_version(tmp_path, tool=tool)
+    assert resolved == version
     assert reason == "global default"
 
 
-def test_resolve_errors_when_unconfigured(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
-
+def test_resolve_errors_when_unconfigured(
+    tmp_path: Path, fake_global_defaults: dict[str, str]
+) -> None:
     with pytest.raises(VersionNotConfiguredError):
         resolve_version(tmp_path)
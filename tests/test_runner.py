@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+
+def test_runner_import_does_not_load_http_or_download_stack() -> None:
+    # Every shim run imports opavm.runner; only installs should pay for these modules.
+    heavy = ["httpx", "hashlib", "mmap", "concurrent.futures", "blake3"]
+    probe = f"import sys, opavm.runner; print(*[m in sys.modules for m in {heavy!r}])"
+
+    result = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.split() == ["False"] * len(heavy)
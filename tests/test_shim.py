@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 import pytest
@@ -7,8 +8,7 @@ import pytest
 from opavm import config, shim
 
 
-def test_ensure_shim_windows_creates_cmd(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
+def test_ensure_shim_windows_creates_cmd(monkeypatch: pytest.MonkeyPatch, opavm_home: Path) -> None:
     monkeypatch.setattr("opavm.shim.platform.normalized_os_arch", lambda: ("windows", "amd64"))
 
     shim_path = shim.ensure_shim()
@@ -19,8 +19,7 @@ def test_ensure_shim_windows_creates_cmd(tmp_path: Path, monkeypatch: pytest.Mon
     assert "%*" in content
 
 
-def test_ensure_shim_posix_creates_opa(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
+def test_ensure_shim_posix_creates_opa(monkeypatch: pytest.MonkeyPatch, opavm_home: Path) -> None:
     monkeypatch.setattr("opavm.shim.platform.normalized_os_arch", lambda: ("linux", "amd64"))
 
     shim_path = shim.ensure_shim()
@@ -29,3 +28,25 @@ def test_ensure_shim_posix_creates_opa(tmp_path: Path, monkeypatch: pytest.Monke
     assert (config.shims_dir() / "opa").exists()
     content = shim_path.read_text(encoding="utf-8")
     assert "opavm which" in content
+
+
+def test_ensure_shim_rewrites_only_stale_content(
+    monkeypatch: pytest.MonkeyPatch, opavm_home: Path
+) -> None:
+    monkeypatch.setattr("opavm.shim.platform.normalized_os_arch", lambda: ("linux", "amd64"))
+    config.ensure_layout()
+    stale = config.shims_dir() / "opa"
+    stale.write_bytes(b"#!/bin/sh\nexit 1\n")
+
+    shim_path = shim.ensure_shim()
+    assert shim_path.read_bytes() == shim._POSIX_SHIM
+    umask = os.umask(0)
+    os.umask(umask)
+    assert shim_path.stat().st_mode & 0o777 == (0o666 & ~umask) | 0o111
+    assert list(config.shims_dir().glob("*.tmp")) == []
+
+    mtime = shim_path.stat().st_mtime_ns
+    os.utime(shim_path, ns=(mtime - 1_000_000, mtime - 1_000_000))
+    shim.ensure_shim()
+    assert shim_path.stat().st_mtime_ns == mtime - 1_000_000
+
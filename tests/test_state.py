@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
 
 import pytest
@@ -8,14 +9,11 @@ import pytest
 from opavm import config
 
 
-def test_load_state_defaults_when_missing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
+def test_load_state_defaults_when_missing(opavm_home: Path) -> None:
     assert config.load_state() == {"global_default": None, "global_defaults": {}}
 
 
-def test_save_state_is_atomic(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
-
+def test_save_state_is_atomic(opavm_home: Path) -> None:
     config.save_state({"global_default": "0.62.1"})
 
     path = config.state_path()
@@ -27,9 +25,35 @@ def test_save_state_is_atomic(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -
     assert leftovers == []
 
 
-def test_set_get_global_default_by_tool(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
+@pytest.mark.parametrize(("durable", "expected_syncs"), [("", 0), ("1", 2)])
+def test_save_state_fsyncs_only_when_durable(
+    monkeypatch: pytest.MonkeyPatch, opavm_home: Path, durable: str, expected_syncs: int
+) -> None:
+    monkeypatch.setenv("OPAVM_DURABLE_STATE", durable)
+    syncs: list[int] = []
+    monkeypatch.setattr(os, "fsync", syncs.append)
+
+    config.save_state({"global_default": "0.62.1"})
+
+    assert len(syncs) == expected_syncs
+    assert json.loads(config.state_path().read_bytes())["global_default"] == "0.62.1"
+
+
+def test_save_state_removes_temp_file_on_failure(
+    monkeypatch: pytest.MonkeyPatch, opavm_home: Path
+) -> None:
+    def fail_replace(src: str, dst: object) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail_replace)
+
+    with pytest.raises(OSError, match="disk full"):
+        config.save_state({"global_default": "0.62.1"})
+
+    assert list(config.state_path().parent.glob("state.*.tmp")) == []
+
 
+def test_set_get_global_default_by_tool(opavm_home: Path) -> None:
     config.set_global_default("opa", "0.62.1")
     config.set_global_default("regal", "0.38.1")
 
@@ -37,10 +61,86 @@ def test_set_get_global_default_by_tool(tmp_path: Path, monkeypatch: pytest.Monk
     assert config.get_global_default("regal") == "0.38.1"
 
 
-def test_get_global_default_opa_falls_back_to_legacy_key(
-    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+def test_set_global_defaults_writes_state_once(
+    monkeypatch: pytest.MonkeyPatch, opavm_home: Path
 ) -> None:
-    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / ".opavm"))
+    saves: list[dict[str, object]] = []
+    real_save = config.save_state
+    monkeypatch.setattr(config, "save_state", lambda data: (saves.append(data), real_save(data)))
+
+    config.set_global_defaults({"opa": "0.62.1", "regal": "0.38.1"})
+
+    assert len(saves) == 1
+    assert config.get_global_default("opa") == "0.62.1"
+    assert config.get_global_default("regal") == "0.38.1"
+    assert config.load_state()["global_default"] == "0.62.1"
+
+
+def test_save_state_skips_unchanged_state(
+    monkeypatch: pytest.MonkeyPatch, opavm_home: Path
+) -> None:
+    config.set_global_default("regal", "0.38.1")
+    replaced: list[str] = []
+    real_replace = os.replace
+
+    def recording_replace(src: str, dst: str) -> None:
+        replaced.append(src)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", recording_replace)
+
+    config.set_global_default("regal", "0.38.1")
+    assert replaced == []
+
+    config.set_global_default("regal", "0.39.0")
+    assert len(replaced) == 1
+    assert list(config.state_path().parent.glob("state.*.tmp")) == []
+
+
+def test_get_global_default_opa_falls_back_to_legacy_key(opavm_home: Path) -> None:
     config.save_state({"global_default": "0.60.0"})
 
     assert config.get_global_default("opa") == "0.60.0"
+
+
+def test_load_state_folds_legacy_key_into_global_defaults(opavm_home: Path) -> None:
+    config.save_state(
+        {"global_default": "0.60.0", "global_defaults": {"opa": " ", "regal": "0.38.1"}}
+    )
+
+    assert config.load_state()["global_defaults"] == {"opa": "0.60.0", "regal": "0.38.1"}
+    assert config.get_global_default("regal") == "0.38.1"
+
+
+def test_load_state_cache_returns_copies_and_sees_external_writes(opavm_home: Path) -> None:
+    config.set_global_default("regal", "0.38.1")
+
+    state = config.load_state()
+    state["global_defaults"]["regal"] = "mutated"
+    assert config.get_global_default("regal") == "0.38.1"
+
+    path = config.state_path()
+    external = {"global_defaults": {"regal": "0.39.0", "opa": "1.0.0"}}
+    path.write_text(json.dumps(external), encoding="utf-8")
+    assert config.get_global_default("regal") == "0.39.0"
+
+
+def test_state_round_trip_without_orjson(monkeypatch: pytest.MonkeyPatch, opavm_home: Path) -> None:
+    monkeypatch.setattr("opavm._json.orjson", None)
+
+    config.set_global_default("opa", "0.62.1")
+
+    raw = config.state_path().read_bytes()
+    assert raw.endswith(b"\n")
+    assert json.loads(raw)["global_defaults"] == {"opa": "0.62.1"}
+    assert config.get_global_default("opa") == "0.62.1"
+
+
+def test_layout_paths_follow_opavm_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / "one"))
+    assert config.state_path() == tmp_path / "one" / "state.json"
+    assert config.state_path() is config.state_path()
+
+    monkeypatch.setenv("OPAVM_HOME", str(tmp_path / "two"))
+    assert config.versions_dir() == tmp_path / "two" / "versions"
+    assert config.tool_versions_dir("regal") == tmp_path / "two" / "tools" / "regal" / "versions"